@@ -2,9 +2,9 @@
 """
 Analiza datos de pruebas de gripper desde un archivo CSV 'Protocolo_Simple.csv'.
 Calcula overshoot, estadísticas básicas, métricas de capacidad y genera reportes.
-Requisitos: pandas, numpy, matplotlib (opcional)
+Requisitos: pandas, numpy, matplotlib (opcional), scipy (opcional), pyarrow (opcional)
 Uso:
-    python analiza_gripper.py [ruta_archivo]
+    python analiza_gripper.py [ruta_archivo] [--force]
 Salida:
     - reporte_metricas.csv
     - reporte_repetibilidad.csv
@@ -14,8 +14,11 @@ Salida:
 
 import sys
 import os
+import csv
+import hashlib
 import math
 import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import pandas as pd
 import numpy as np
@@ -36,6 +39,19 @@ except ImportError:
     SCIPY_AVAILABLE = False
     print("Nota: scipy no disponible. No se realizará análisis ANOVA ni pruebas de normalidad.")
 
+# Opcional: lectores más rápidos para CSV (pyarrow) y XLSX (calamine)
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
 warnings.filterwarnings('ignore', category=RuntimeWarning)
 
 # ---------- Parámetros ajustables ----------
@@ -46,6 +62,19 @@ TOL_POS_MM = 0.5              # Tolerancia para Cpk de posición (± TOL respect
 CPK_MIN_OBJ = 1.33            # Objetivo de capacidad típico
 FORCE_TOLERANCE_N = 0.5       # Tolerancia aceptable en fuerza (N)
 
+# Marcadores de estado en la interpretación (ASCII, se escriben tal cual)
+CHECK = "[OK]"
+WARN = "[!]"
+CROSS = "[X]"
+
+# Formateadores numéricos creados una sola vez para los bucles del reporte
+_F2 = "{:.2f}".format
+_F4 = "{:.4f}".format
+_F6 = "{:.6f}".format
+
+# Firma de la configuración usada para generar los reportes (invalida la caché)
+SIGNATURE_FILE = "interpretacion.sig"
+
 REQUIRED_COLS = [
     "ID_Prueba", "Tipo_Prueba", "Objeto", "Masa_g",
     "Setpoint_Fuerza_N", "Fuerza_Medida_N", "Fuerza_Pico_N",
@@ -54,29 +83,51 @@ REQUIRED_COLS = [
     "Temp_Min_C", "Temp_Max_C", "Notas"
 ]
 
+# Columnas numéricas del protocolo (se convierten una sola vez al cargar)
+NUMERIC_COLS = [
+    "Masa_g", "Setpoint_Fuerza_N", "Fuerza_Medida_N", "Fuerza_Pico_N",
+    "Posicion_Objetivo_mm", "Posicion_mm", "Tiempo_Respuesta_ms",
+    "Exito_Agarre_1o0", "Temp_Min_C", "Temp_Max_C"
+]
+
+# Variables analizadas en ANOVA y distribución normal
+ANALYSIS_VARIABLES = ['Fuerza_Medida_N', 'Tiempo_Respuesta_ms', 'Overshoot_pct', 'Error_Fuerza_N']
+
+# Tipos de lectura: las columnas de agrupación se cargan como category;
+# las numéricas se dejan a la inferencia del motor C (int64/float64)
+_DTYPES = {"Tipo_Prueba": "category", "Objeto": "category"}
+
+
+def read_input_csv(path):
+    """
+    Lee el CSV de entrada con solo las columnas requeridas.
+    Usa el motor pyarrow (multihilo) si está instalado y vuelve al motor C
+    si pyarrow no está disponible o no puede leer el archivo.
+    """
+    if PYARROW_AVAILABLE:
+        try:
+            # pyarrow no acepta usecols como función: se filtra sobre el encabezado
+            header = pd.read_csv(path, encoding='utf-8-sig', nrows=0).columns
+            usecols = [c for c in header if c in REQUIRED_COLS]
+            return pd.read_csv(path, encoding='utf-8-sig', engine='pyarrow', usecols=usecols).astype(_DTYPES)
+        except Exception:
+            pass
+    
+    return pd.read_csv(path, encoding='utf-8-sig', engine='c',
+                       usecols=lambda c: c in REQUIRED_COLS, dtype=_DTYPES)
+
 
 def compute_overshoot(setpoint, f_pico):
-    """Calcula el overshoot como porcentaje del setpoint."""
-    try:
-        setpoint = float(setpoint)
-        f_pico = float(f_pico)
-        if pd.isna(setpoint) or setpoint == 0:
-            return np.nan
-        return (f_pico - setpoint) / setpoint * 100.0
-    except (ValueError, TypeError):
-        return np.nan
+    """Calcula el overshoot como porcentaje del setpoint (arrays completos)."""
+    setpoint = np.asarray(setpoint, dtype=np.float64)
+    f_pico = np.asarray(f_pico, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(setpoint != 0, (f_pico - setpoint) / setpoint * 100.0, np.nan)
 
 
 def compute_error(medida, setpoint):
-    """Calcula el error absoluto entre medida y setpoint."""
-    try:
-        medida = float(medida)
-        setpoint = float(setpoint)
-        if pd.isna(medida) or pd.isna(setpoint):
-            return np.nan
-        return medida - setpoint
-    except (ValueError, TypeError):
-        return np.nan
+    """Calcula el error absoluto entre medida y setpoint (arrays completos)."""
+    return np.asarray(medida, dtype=np.float64) - np.asarray(setpoint, dtype=np.float64)
 
 
 def cpk_from_series(x, target, tol):
@@ -105,34 +156,65 @@ def cpk_from_series(x, target, tol):
     return min(cpu, cpl)
 
 
+def _numeric_array(df, col):
+    """Convierte una columna a ndarray numérico (valores no numéricos -> NaN)."""
+    return pd.to_numeric(df[col], errors="coerce").to_numpy()
+
+
+def _group_positions(keys):
+    """
+    Devuelve [(clave, posiciones)] ordenado por clave, equivalente a
+    iterar groupby(sort=True) pero sin construir un DataFrame por grupo.
+    """
+    codes, uniques = pd.factorize(keys, sort=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return [(uniques[k], order[bounds[k]:bounds[k + 1]]) for k in range(len(uniques))]
+
+
+def _mean_std(values):
+    """Media y desviación estándar (ddof=1) de valores ya filtrados."""
+    media = values.mean() if len(values) > 0 else np.nan
+    std = values.std(ddof=1) if len(values) > 1 else np.nan
+    return media, std
+
+
+def _pct_within(values, limit):
+    """
+    Porcentaje de casos con valor <= limit. Los NaN cuentan como fuera
+    de límite pero sí entran en el denominador (comparación NaN -> False).
+    """
+    return 100.0 * np.mean(values <= limit)
+
+
 def analyze_by_test_type(df):
     """Analiza métricas por tipo de prueba."""
     results = []
     
-    for tipo, grupo in df.groupby("Tipo_Prueba"):
-        n = len(grupo)
-        exito_rate = 100.0 * pd.to_numeric(grupo["Exito_Agarre_1o0"], errors="coerce").fillna(0).mean()
-        
-        f_medida = pd.to_numeric(grupo["Fuerza_Medida_N"], errors="coerce")
-        f_media = f_medida.mean()
-        f_std = f_medida.std(ddof=1)
-        
-        t_resp = pd.to_numeric(grupo["Tiempo_Respuesta_ms"], errors="coerce")
-        t_media = t_resp.mean()
-        t_std = t_resp.std(ddof=1)
+    # Columnas convertidas una sola vez y máscaras de validez reutilizables
+    exito = np.nan_to_num(_numeric_array(df, "Exito_Agarre_1o0"), nan=0.0)
+    fm = _numeric_array(df, "Fuerza_Medida_N")
+    tr = _numeric_array(df, "Tiempo_Respuesta_ms")
+    ov = _numeric_array(df, "Overshoot_pct")
+    mask_fm, mask_tr, mask_ov = np.isfinite(fm), np.isfinite(tr), np.isfinite(ov)
+    
+    for tipo, idx in _group_positions(df["Tipo_Prueba"]):
+        n = len(idx)
+        exito_rate = 100.0 * exito[idx].mean()
         
-        ov = pd.to_numeric(grupo["Overshoot_pct"], errors="coerce")
-        ov_media = ov.mean()
+        f_media, f_std = _mean_std(fm[idx][mask_fm[idx]])
+        t_media, t_std = _mean_std(tr[idx][mask_tr[idx]])
+        ov_media, _ = _mean_std(ov[idx][mask_ov[idx]])
         
         results.append({
             "Tipo_Prueba": tipo,
             "n_pruebas": n,
             "Tasa_Exito_%": round(exito_rate, 2),
-            "Fuerza_Media_N": round(f_media, 3) if not pd.isna(f_media) else np.nan,
-            "Fuerza_Std_N": round(f_std, 3) if not pd.isna(f_std) else np.nan,
-            "Tiempo_Media_ms": round(t_media, 1) if not pd.isna(t_media) else np.nan,
-            "Tiempo_Std_ms": round(t_std, 1) if not pd.isna(t_std) else np.nan,
-            "Overshoot_Media_%": round(ov_media, 2) if not pd.isna(ov_media) else np.nan
+            "Fuerza_Media_N": round(f_media, 3) if not np.isnan(f_media) else np.nan,
+            "Fuerza_Std_N": round(f_std, 3) if not np.isnan(f_std) else np.nan,
+            "Tiempo_Media_ms": round(t_media, 1) if not np.isnan(t_media) else np.nan,
+            "Tiempo_Std_ms": round(t_std, 1) if not np.isnan(t_std) else np.nan,
+            "Overshoot_Media_%": round(ov_media, 2) if not np.isnan(ov_media) else np.nan
         })
     
     return pd.DataFrame(results)
@@ -142,24 +224,27 @@ def analyze_by_object(df):
     """Analiza métricas por tipo de objeto."""
     results = []
     
-    for objeto, grupo in df.groupby("Objeto"):
-        n = len(grupo)
-        masa = pd.to_numeric(grupo["Masa_g"], errors="coerce").iloc[0]
-        exito_rate = 100.0 * pd.to_numeric(grupo["Exito_Agarre_1o0"], errors="coerce").fillna(0).mean()
-        
-        f_medida = pd.to_numeric(grupo["Fuerza_Medida_N"], errors="coerce")
-        f_media = f_medida.mean()
+    masa_g = _numeric_array(df, "Masa_g")
+    exito = np.nan_to_num(_numeric_array(df, "Exito_Agarre_1o0"), nan=0.0)
+    fm = _numeric_array(df, "Fuerza_Medida_N")
+    tr = _numeric_array(df, "Tiempo_Respuesta_ms")
+    mask_fm, mask_tr = np.isfinite(fm), np.isfinite(tr)
+    
+    for objeto, idx in _group_positions(df["Objeto"]):
+        n = len(idx)
+        masa = masa_g[idx[0]]
+        exito_rate = 100.0 * exito[idx].mean()
         
-        t_resp = pd.to_numeric(grupo["Tiempo_Respuesta_ms"], errors="coerce")
-        t_media = t_resp.mean()
+        f_media, _ = _mean_std(fm[idx][mask_fm[idx]])
+        t_media, _ = _mean_std(tr[idx][mask_tr[idx]])
         
         results.append({
             "Objeto": objeto,
             "Masa_g": masa,
             "n_pruebas": n,
             "Tasa_Exito_%": round(exito_rate, 2),
-            "Fuerza_Media_N": round(f_media, 3) if not pd.isna(f_media) else np.nan,
-            "Tiempo_Media_ms": round(t_media, 1) if not pd.isna(t_media) else np.nan
+            "Fuerza_Media_N": round(f_media, 3) if not np.isnan(f_media) else np.nan,
+            "Tiempo_Media_ms": round(t_media, 1) if not np.isnan(t_media) else np.nan
         })
     
     return pd.DataFrame(results).sort_values("Masa_g")
@@ -175,7 +260,7 @@ def analyze_repeatability(df_rep, tol_pos_mm):
     df_rep["Posicion_Objetivo_mm"] = pd.to_numeric(df_rep["Posicion_Objetivo_mm"], errors="coerce")
     df_rep["Posicion_mm"] = pd.to_numeric(df_rep["Posicion_mm"], errors="coerce")
     
-    for (obj, objetivo), g in df_rep.groupby(["Objeto", "Posicion_Objetivo_mm"]):
+    for (obj, objetivo), g in df_rep.groupby(["Objeto", "Posicion_Objetivo_mm"], observed=True):
         pos = g["Posicion_mm"].dropna()
         
         if len(pos) < 2:
@@ -207,6 +292,71 @@ def analyze_repeatability(df_rep, tol_pos_mm):
     return pd.DataFrame(rep_rows)
 
 
+def _anova_one_var(df, var):
+    """Calcula el ANOVA de una variable entre tipos de prueba."""
+    try:
+        # Preparar datos por tipo de prueba
+        grupos = []
+        tipos = []
+        
+        values = _numeric_array(df, var)
+        valid = np.isfinite(values)
+        
+        for tipo, idx in _group_positions(df['Tipo_Prueba']):
+            data = values[idx][valid[idx]]
+            if len(data) >= 3:  # Mínimo 3 observaciones por grupo
+                grupos.append(data)
+                tipos.append(tipo)
+        
+        if len(grupos) >= 2:
+            # Realizar ANOVA
+            f_stat, p_value = f_oneway(*grupos)
+            
+            # Calcular estadísticas descriptivas por grupo
+            group_stats = []
+            for i, (tipo, grupo_data) in enumerate(zip(tipos, grupos)):
+                group_stats.append({
+                    'Tipo_Prueba': tipo,
+                    'n': len(grupo_data),
+                    'Media': np.mean(grupo_data),
+                    'Std': np.std(grupo_data, ddof=1),
+                    'Min': np.min(grupo_data),
+                    'Max': np.max(grupo_data)
+                })
+            
+            return {
+                'Variable': var,
+                'F_statistic': round(f_stat, 4),
+                'p_value': round(p_value, 6),
+                'Significativo': 'Sí' if p_value < 0.05 else 'No',
+                'n_grupos': len(grupos),
+                'Interpretacion': 'Diferencias significativas entre grupos' if p_value < 0.05 
+                               else 'No hay diferencias significativas entre grupos',
+                'Estadisticas_grupos': group_stats
+            }
+        else:
+            return {
+                'Variable': var,
+                'F_statistic': np.nan,
+                'p_value': np.nan,
+                'Significativo': 'N/A',
+                'n_grupos': len(grupos),
+                'Interpretacion': f'Insuficientes grupos válidos para ANOVA (se requieren ≥2, se tienen {len(grupos)})',
+                'Estadisticas_grupos': []
+            }
+            
+    except Exception as e:
+        return {
+            'Variable': var,
+            'F_statistic': np.nan,
+            'p_value': np.nan,
+            'Significativo': 'Error',
+            'n_grupos': 0,
+            'Interpretacion': f'Error en análisis: {str(e)}',
+            'Estadisticas_grupos': []
+        }
+
+
 def analyze_anova_by_test_type(df):
     """
     Realiza análisis ANOVA para comparar diferencias entre tipos de prueba.
@@ -216,178 +366,22 @@ def analyze_anova_by_test_type(df):
         print("Advertencia: scipy no disponible. No se puede realizar ANOVA.")
         return pd.DataFrame()
     
-    results = []
-    variables = ['Fuerza_Medida_N', 'Tiempo_Respuesta_ms', 'Overshoot_pct', 'Error_Fuerza_N']
-    
-    for var in variables:
-        try:
-            # Preparar datos por tipo de prueba
-            grupos = []
-            tipos = []
-            
-            for tipo, grupo in df.groupby('Tipo_Prueba'):
-                data = pd.to_numeric(grupo[var], errors='coerce').dropna()
-                if len(data) >= 3:  # Mínimo 3 observaciones por grupo
-                    grupos.append(data.values)
-                    tipos.append(tipo)
-            
-            if len(grupos) >= 2:
-                # Realizar ANOVA
-                f_stat, p_value = f_oneway(*grupos)
-                
-                # Calcular estadísticas descriptivas por grupo
-                group_stats = []
-                for i, (tipo, grupo_data) in enumerate(zip(tipos, grupos)):
-                    group_stats.append({
-                        'Tipo_Prueba': tipo,
-                        'n': len(grupo_data),
-                        'Media': np.mean(grupo_data),
-                        'Std': np.std(grupo_data, ddof=1),
-                        'Min': np.min(grupo_data),
-                        'Max': np.max(grupo_data)
-                    })
-                
-                results.append({
-                    'Variable': var,
-                    'F_statistic': round(f_stat, 4),
-                    'p_value': round(p_value, 6),
-                    'Significativo': 'Sí' if p_value < 0.05 else 'No',
-                    'n_grupos': len(grupos),
-                    'Interpretacion': 'Diferencias significativas entre grupos' if p_value < 0.05 
-                                   else 'No hay diferencias significativas entre grupos',
-                    'Estadisticas_grupos': group_stats
-                })
-            else:
-                results.append({
-                    'Variable': var,
-                    'F_statistic': np.nan,
-                    'p_value': np.nan,
-                    'Significativo': 'N/A',
-                    'n_grupos': len(grupos),
-                    'Interpretacion': f'Insuficientes grupos válidos para ANOVA (se requieren ≥2, se tienen {len(grupos)})',
-                    'Estadisticas_grupos': []
-                })
-                
-        except Exception as e:
-            results.append({
-                'Variable': var,
-                'F_statistic': np.nan,
-                'p_value': np.nan,
-                'Significativo': 'Error',
-                'n_grupos': 0,
-                'Interpretacion': f'Error en análisis: {str(e)}',
-                'Estadisticas_grupos': []
-            })
+    # Las variables son independientes y scipy libera el GIL en sus rutinas C
+    with ThreadPoolExecutor(max_workers=len(ANALYSIS_VARIABLES)) as ex:
+        results = list(ex.map(lambda var: _anova_one_var(df, var), ANALYSIS_VARIABLES))
     
     return pd.DataFrame(results)
 
 
-def analyze_normal_distribution(df):
-    """
-    Analiza la distribución normal de las variables principales y calcula
-    casos fuera de ±3σ (límites de control estadístico).
-    """
-    results = []
-    variables = ['Fuerza_Medida_N', 'Tiempo_Respuesta_ms', 'Overshoot_pct', 'Error_Fuerza_N']
-    
-    for var in variables:
-        try:
-            data = pd.to_numeric(df[var], errors='coerce').dropna()
-            
-            if len(data) < 3:
-                results.append({
-                    'Variable': var,
-                    'n': len(data),
-                    'Media': np.nan,
-                    'Desv_Std': np.nan,
-                    'Limite_Inferior_3sigma': np.nan,
-                    'Limite_Superior_3sigma': np.nan,
-                    'Casos_fuera_3sigma': np.nan,
-                    'Pct_fuera_3sigma': np.nan,
-                    'Shapiro_W': np.nan,
-                    'Shapiro_p': np.nan,
-                    'Es_Normal_Shapiro': 'N/A',
-                    'Normaltest_stat': np.nan,
-                    'Normaltest_p': np.nan,
-                    'Es_Normal_DAgostino': 'N/A',
-                    'Interpretacion': 'Insuficientes datos para análisis'
-                })
-                continue
-            
-            # Estadísticas básicas
-            media = np.mean(data)
-            std = np.std(data, ddof=1)
-            n = len(data)
-            
-            # Límites de ±3σ
-            limite_inf_3s = media - 3 * std
-            limite_sup_3s = media + 3 * std
-            
-            # Casos fuera de ±3σ
-            fuera_3sigma = ((data < limite_inf_3s) | (data > limite_sup_3s)).sum()
-            pct_fuera_3sigma = (fuera_3sigma / n) * 100
-            
-            # Pruebas de normalidad
-            shapiro_w, shapiro_p = np.nan, np.nan
-            normaltest_stat, normaltest_p = np.nan, np.nan
-            
-            if SCIPY_AVAILABLE:
-                try:
-                    if n >= 3 and n <= 5000:  # Shapiro-Wilk funciona bien en este rango
-                        shapiro_w, shapiro_p = shapiro(data)
-                    
-                    if n >= 8:  # D'Agostino requiere al menos 8 observaciones
-                        normaltest_stat, normaltest_p = normaltest(data)
-                except:
-                    pass  # Si hay error, mantener NaN
-            
-            # Interpretación de normalidad
-            es_normal_shapiro = 'N/A'
-            if not np.isnan(shapiro_p):
-                es_normal_shapiro = 'Sí' if shapiro_p > 0.05 else 'No'
-            
-            es_normal_dagostino = 'N/A'
-            if not np.isnan(normaltest_p):
-                es_normal_dagostino = 'Sí' if normaltest_p > 0.05 else 'No'
-            
-            # Interpretación general
-            if pct_fuera_3sigma <= 0.27:  # Esperado teóricamente: ~0.27%
-                control_msg = "Dentro de control estadístico"
-            elif pct_fuera_3sigma <= 1.0:
-                control_msg = "Ligeramente fuera de control"
-            else:
-                control_msg = "Fuera de control estadístico"
-            
-            interpretacion = f"{control_msg}. "
-            if es_normal_shapiro == 'Sí' or es_normal_dagostino == 'Sí':
-                interpretacion += "Distribución aproximadamente normal."
-            elif es_normal_shapiro == 'No' or es_normal_dagostino == 'No':
-                interpretacion += "Distribución NO normal - considerar transformaciones."
-            else:
-                interpretacion += "Normalidad no evaluada."
-            
-            results.append({
-                'Variable': var,
-                'n': n,
-                'Media': round(media, 4),
-                'Desv_Std': round(std, 4),
-                'Limite_Inferior_3sigma': round(limite_inf_3s, 4),
-                'Limite_Superior_3sigma': round(limite_sup_3s, 4),
-                'Casos_fuera_3sigma': int(fuera_3sigma),
-                'Pct_fuera_3sigma': round(pct_fuera_3sigma, 2),
-                'Shapiro_W': round(shapiro_w, 4) if not np.isnan(shapiro_w) else np.nan,
-                'Shapiro_p': round(shapiro_p, 4) if not np.isnan(shapiro_p) else np.nan,
-                'Es_Normal_Shapiro': es_normal_shapiro,
-                'Normaltest_stat': round(normaltest_stat, 4) if not np.isnan(normaltest_stat) else np.nan,
-                'Normaltest_p': round(normaltest_p, 4) if not np.isnan(normaltest_p) else np.nan,
-                'Es_Normal_DAgostino': es_normal_dagostino,
-                'Interpretacion': interpretacion
-            })
-            
-        except Exception as e:
-            results.append({
+def _normal_one_var(df, var):
+    """Evalúa normalidad y límites ±3σ de una variable."""
+    try:
+        data = pd.to_numeric(df[var], errors='coerce').dropna()
+        
+        if len(data) < 3:
+            return {
                 'Variable': var,
-                'n': 0,
+                'n': len(data),
                 'Media': np.nan,
                 'Desv_Std': np.nan,
                 'Limite_Inferior_3sigma': np.nan,
@@ -396,12 +390,110 @@ def analyze_normal_distribution(df):
                 'Pct_fuera_3sigma': np.nan,
                 'Shapiro_W': np.nan,
                 'Shapiro_p': np.nan,
-                'Es_Normal_Shapiro': 'Error',
+                'Es_Normal_Shapiro': 'N/A',
                 'Normaltest_stat': np.nan,
                 'Normaltest_p': np.nan,
-                'Es_Normal_DAgostino': 'Error',
-                'Interpretacion': f'Error en análisis: {str(e)}'
-            })
+                'Es_Normal_DAgostino': 'N/A',
+                'Interpretacion': 'Insuficientes datos para análisis'
+            }
+        
+        # Estadísticas básicas
+        media = np.mean(data)
+        std = np.std(data, ddof=1)
+        n = len(data)
+        
+        # Límites de ±3σ
+        limite_inf_3s = media - 3 * std
+        limite_sup_3s = media + 3 * std
+        
+        # Casos fuera de ±3σ
+        fuera_3sigma = ((data < limite_inf_3s) | (data > limite_sup_3s)).sum()
+        pct_fuera_3sigma = (fuera_3sigma / n) * 100
+        
+        # Pruebas de normalidad
+        shapiro_w, shapiro_p = np.nan, np.nan
+        normaltest_stat, normaltest_p = np.nan, np.nan
+        
+        if SCIPY_AVAILABLE:
+            try:
+                if n >= 3 and n <= 5000:  # Shapiro-Wilk funciona bien en este rango
+                    shapiro_w, shapiro_p = shapiro(data)
+                
+                if n >= 8:  # D'Agostino requiere al menos 8 observaciones
+                    normaltest_stat, normaltest_p = normaltest(data)
+            except:
+                pass  # Si hay error, mantener NaN
+        
+        # Interpretación de normalidad
+        es_normal_shapiro = 'N/A'
+        if not np.isnan(shapiro_p):
+            es_normal_shapiro = 'Sí' if shapiro_p > 0.05 else 'No'
+        
+        es_normal_dagostino = 'N/A'
+        if not np.isnan(normaltest_p):
+            es_normal_dagostino = 'Sí' if normaltest_p > 0.05 else 'No'
+        
+        # Interpretación general
+        if pct_fuera_3sigma <= 0.27:  # Esperado teóricamente: ~0.27%
+            control_msg = "Dentro de control estadístico"
+        elif pct_fuera_3sigma <= 1.0:
+            control_msg = "Ligeramente fuera de control"
+        else:
+            control_msg = "Fuera de control estadístico"
+        
+        interpretacion = f"{control_msg}. "
+        if es_normal_shapiro == 'Sí' or es_normal_dagostino == 'Sí':
+            interpretacion += "Distribución aproximadamente normal."
+        elif es_normal_shapiro == 'No' or es_normal_dagostino == 'No':
+            interpretacion += "Distribución NO normal - considerar transformaciones."
+        else:
+            interpretacion += "Normalidad no evaluada."
+        
+        return {
+            'Variable': var,
+            'n': n,
+            'Media': round(media, 4),
+            'Desv_Std': round(std, 4),
+            'Limite_Inferior_3sigma': round(limite_inf_3s, 4),
+            'Limite_Superior_3sigma': round(limite_sup_3s, 4),
+            'Casos_fuera_3sigma': int(fuera_3sigma),
+            'Pct_fuera_3sigma': round(pct_fuera_3sigma, 2),
+            'Shapiro_W': round(shapiro_w, 4) if not np.isnan(shapiro_w) else np.nan,
+            'Shapiro_p': round(shapiro_p, 4) if not np.isnan(shapiro_p) else np.nan,
+            'Es_Normal_Shapiro': es_normal_shapiro,
+            'Normaltest_stat': round(normaltest_stat, 4) if not np.isnan(normaltest_stat) else np.nan,
+            'Normaltest_p': round(normaltest_p, 4) if not np.isnan(normaltest_p) else np.nan,
+            'Es_Normal_DAgostino': es_normal_dagostino,
+            'Interpretacion': interpretacion
+        }
+        
+    except Exception as e:
+        return {
+            'Variable': var,
+            'n': 0,
+            'Media': np.nan,
+            'Desv_Std': np.nan,
+            'Limite_Inferior_3sigma': np.nan,
+            'Limite_Superior_3sigma': np.nan,
+            'Casos_fuera_3sigma': np.nan,
+            'Pct_fuera_3sigma': np.nan,
+            'Shapiro_W': np.nan,
+            'Shapiro_p': np.nan,
+            'Es_Normal_Shapiro': 'Error',
+            'Normaltest_stat': np.nan,
+            'Normaltest_p': np.nan,
+            'Es_Normal_DAgostino': 'Error',
+            'Interpretacion': f'Error en análisis: {str(e)}'
+        }
+
+
+def analyze_normal_distribution(df):
+    """
+    Analiza la distribución normal de las variables principales y calcula
+    casos fuera de ±3σ (límites de control estadístico).
+    """
+    with ThreadPoolExecutor(max_workers=len(ANALYSIS_VARIABLES)) as ex:
+        results = list(ex.map(lambda var: _normal_one_var(df, var), ANALYSIS_VARIABLES))
     
     return pd.DataFrame(results)
 
@@ -441,7 +533,7 @@ def generate_plots(df, output_dir="."):
         axes[0, 1].grid(True, alpha=0.3)
         
         # Tiempo de respuesta por objeto
-        tiempo_obj = df_plot.groupby('Objeto')['Tiempo_Respuesta_ms'].agg(['mean', 'std'])
+        tiempo_obj = df_plot.groupby('Objeto', observed=True)['Tiempo_Respuesta_ms'].agg(['mean', 'std'])
         tiempo_obj = tiempo_obj.sort_values('mean')
         axes[1, 0].barh(range(len(tiempo_obj)), tiempo_obj['mean'], xerr=tiempo_obj['std'], alpha=0.7)
         axes[1, 0].set_yticks(range(len(tiempo_obj)))
@@ -453,8 +545,8 @@ def generate_plots(df, output_dir="."):
         axes[1, 0].grid(True, alpha=0.3, axis='x')
         
         # Error de fuerza
-        df_plot['Error_Fuerza'] = df_plot.apply(
-            lambda r: compute_error(r['Fuerza_Medida_N'], r['Setpoint_Fuerza_N']), axis=1
+        df_plot['Error_Fuerza'] = compute_error(
+            _numeric_array(df_plot, 'Fuerza_Medida_N'), df_plot['Setpoint'].to_numpy()
         )
         error_data = df_plot[['Setpoint', 'Error_Fuerza']].dropna()
         axes[1, 1].scatter(error_data['Setpoint'], error_data['Error_Fuerza'], alpha=0.5)
@@ -482,39 +574,34 @@ def generate_distribution_plots(df, normal_analysis, output_dir="."):
         return
     
     try:
-        variables = ['Fuerza_Medida_N', 'Tiempo_Respuesta_ms', 'Overshoot_pct', 'Error_Fuerza_N']
+        variables = ANALYSIS_VARIABLES
         fig, axes = plt.subplots(2, 2, figsize=(16, 12))
         fig.suptitle('Análisis de Distribución Normal y Límites de Control (±3σ)', 
                     fontsize=16, fontweight='bold')
         
         axes = axes.ravel()
         
+        # Estadísticas ya calculadas por analyze_normal_distribution
+        stats_by_var = normal_analysis.set_index('Variable').to_dict('index')
+        
         for i, var in enumerate(variables):
             # Obtener datos
-            data = pd.to_numeric(df[var], errors='coerce').dropna()
+            data = pd.to_numeric(df[var], errors='coerce').to_numpy(dtype=np.float64)
+            data = data[np.isfinite(data)]
+            var_stats = stats_by_var.get(var)
             
-            if len(data) < 3:
+            if len(data) < 3 or var_stats is None or pd.isna(var_stats['Media']):
                 axes[i].text(0.5, 0.5, f'Insuficientes datos\npara {var}', 
                            ha='center', va='center', transform=axes[i].transAxes)
                 axes[i].set_title(f'{var}')
                 continue
             
-            # Buscar estadísticas en normal_analysis
-            var_stats = normal_analysis[normal_analysis['Variable'] == var]
-            if len(var_stats) > 0:
-                media = var_stats.iloc[0]['Media']
-                std = var_stats.iloc[0]['Desv_Std']
-                limite_inf = var_stats.iloc[0]['Limite_Inferior_3sigma']
-                limite_sup = var_stats.iloc[0]['Limite_Superior_3sigma']
-                fuera_3sigma = var_stats.iloc[0]['Casos_fuera_3sigma']
-                pct_fuera = var_stats.iloc[0]['Pct_fuera_3sigma']
-            else:
-                media = np.mean(data)
-                std = np.std(data, ddof=1)
-                limite_inf = media - 3 * std
-                limite_sup = media + 3 * std
-                fuera_3sigma = ((data < limite_inf) | (data > limite_sup)).sum()
-                pct_fuera = (fuera_3sigma / len(data)) * 100
+            media = var_stats['Media']
+            std = var_stats['Desv_Std']
+            limite_inf = var_stats['Limite_Inferior_3sigma']
+            limite_sup = var_stats['Limite_Superior_3sigma']
+            fuera_3sigma = var_stats['Casos_fuera_3sigma']
+            pct_fuera = var_stats['Pct_fuera_3sigma']
             
             # Histograma con curva normal teórica
             axes[i].hist(data, bins=20, density=True, alpha=0.7, color='lightblue', 
@@ -536,7 +623,7 @@ def generate_distribution_plots(df, normal_analysis, output_dir="."):
             fuera_control = data[(data < limite_inf) | (data > limite_sup)]
             if len(fuera_control) > 0:
                 y_height = axes[i].get_ylim()[1] * 0.1
-                axes[i].scatter(fuera_control, [y_height] * len(fuera_control), 
+                axes[i].scatter(fuera_control, np.full(len(fuera_control), y_height), 
                               color='red', s=50, marker='x', 
                               label=f'Fuera de control ({int(fuera_3sigma)} casos, {pct_fuera:.1f}%)')
             
@@ -564,9 +651,9 @@ def generate_anova_plots(df, anova_results, output_dir="."):
     try:
         # Filtrar variables con resultados válidos de ANOVA
         variables_validas = []
-        for _, row in anova_results.iterrows():
-            if not pd.isna(row['F_statistic']) and row['n_grupos'] >= 2:
-                variables_validas.append(row['Variable'])
+        for row in anova_results.itertuples(index=False):
+            if not pd.isna(row.F_statistic) and row.n_grupos >= 2:
+                variables_validas.append(row.Variable)
         
         if len(variables_validas) == 0:
             print("No hay variables válidas para gráficos ANOVA")
@@ -592,7 +679,7 @@ def generate_anova_plots(df, anova_results, output_dir="."):
             data_plot = []
             labels_plot = []
             
-            for tipo, grupo in df.groupby('Tipo_Prueba'):
+            for tipo, grupo in df.groupby('Tipo_Prueba', observed=True):
                 data = pd.to_numeric(grupo[var], errors='coerce').dropna()
                 if len(data) >= 3:
                     data_plot.append(data.values)
@@ -638,211 +725,271 @@ def generate_anova_plots(df, anova_results, output_dir="."):
         print(f"Advertencia: No se pudieron generar gráficos ANOVA. Error: {e}")
 
 
-def generate_interpretation(metrics, rep_table, obj_table, df, anova_results=None, normal_analysis=None):
-    """Genera un reporte de interpretación detallado."""
-    lines = []
-    lines.append("=" * 70)
-    lines.append("REPORTE DE ANÁLISIS DE GRIPPER")
-    lines.append("=" * 70)
-    lines.append(f"\nTotal de pruebas: {metrics['n_total']}")
-    lines.append(f"Rango de temperatura: {metrics['Temp_Min_C']:.1f}°C - {metrics['Temp_Max_C']:.1f}°C")
+def generate_interpretation(out, metrics, rep_table, obj_table, df, anova_results=None, normal_analysis=None):
+    """
+    Genera un reporte de interpretación detallado.
+    Las líneas se escriben directamente en `out` (archivo o io.StringIO).
+    """
+    def emit(text):
+        out.write(text)
+        out.write("\n")
+    
+    emit("=" * 70)
+    emit("REPORTE DE ANÁLISIS DE GRIPPER")
+    emit("=" * 70)
+    emit(f"\nTotal de pruebas: {metrics['n_total']}")
+    emit(f"Rango de temperatura: {metrics['Temp_Min_C']:.1f}°C - {metrics['Temp_Max_C']:.1f}°C")
     
     # Sección de éxito
-    lines.append("\n" + "=" * 70)
-    lines.append("1. TASA DE ÉXITO")
-    lines.append("=" * 70)
+    emit("\n" + "=" * 70)
+    emit("1. TASA DE ÉXITO")
+    emit("=" * 70)
     tasa = metrics['tasa_exito_pct']
-    status = "✓ OK" if tasa >= SUCCESS_TARGET_PCT else "✗ REQUIERE ATENCIÓN"
-    lines.append(f"Tasa de éxito global: {tasa:.1f}% {status}")
-    lines.append(f"Objetivo: ≥{SUCCESS_TARGET_PCT}%")
-    lines.append(f"Éxitos: {metrics['n_exitos']} / {metrics['n_total']}")
+    status = f"{CHECK} OK" if tasa >= SUCCESS_TARGET_PCT else f"{CROSS} REQUIERE ATENCIÓN"
+    emit(f"Tasa de éxito global: {tasa:.1f}% {status}")
+    emit(f"Objetivo: ≥{SUCCESS_TARGET_PCT}%")
+    emit(f"Éxitos: {metrics['n_exitos']} / {metrics['n_total']}")
     
     # Análisis de falla por setpoint
     if metrics['n_total'] - metrics['n_exitos'] > 0:
         df_fallas = df[pd.to_numeric(df['Exito_Agarre_1o0'], errors='coerce') == 0]
         if len(df_fallas) > 0:
-            lines.append(f"\nAnálisis de fallas ({len(df_fallas)} casos):")
+            emit(f"\nAnálisis de fallas ({len(df_fallas)} casos):")
             setpoint_fallas = df_fallas.groupby('Setpoint_Fuerza_N').size().sort_values(ascending=False)
             for sp, count in setpoint_fallas.head(3).items():
-                lines.append(f"  - Setpoint {sp}N: {count} fallas")
+                emit(f"  - Setpoint {sp}N: {count} fallas")
     
     # Sección de fuerza
-    lines.append("\n" + "=" * 70)
-    lines.append("2. DESEMPEÑO DE FUERZA")
-    lines.append("=" * 70)
-    lines.append(f"Fuerza medida promedio: {metrics['Fuerza_media']:.3f} ± {metrics['Fuerza_std']:.3f} N")
-    lines.append(f"Error promedio: {metrics['Error_Fuerza_media']:.3f} N")
+    emit("\n" + "=" * 70)
+    emit("2. DESEMPEÑO DE FUERZA")
+    emit("=" * 70)
+    emit(f"Fuerza medida promedio: {metrics['Fuerza_media']:.3f} ± {metrics['Fuerza_std']:.3f} N")
+    emit(f"Error promedio: {metrics['Error_Fuerza_media']:.3f} N")
     
     if not math.isnan(metrics.get('Error_Fuerza_pct_dentro', np.nan)):
         pct_dentro = metrics['Error_Fuerza_pct_dentro']
-        status = "✓ OK" if pct_dentro >= 90 else "⚠ Revisar"
-        lines.append(f"Casos dentro de tolerancia (±{FORCE_TOLERANCE_N}N): {pct_dentro:.1f}% {status}")
+        status = f"{CHECK} OK" if pct_dentro >= 90 else f"{WARN} Revisar"
+        emit(f"Casos dentro de tolerancia (±{FORCE_TOLERANCE_N}N): {pct_dentro:.1f}% {status}")
     
     # Sección de overshoot
-    lines.append("\n" + "=" * 70)
-    lines.append("3. OVERSHOOT")
-    lines.append("=" * 70)
+    emit("\n" + "=" * 70)
+    emit("3. OVERSHOOT")
+    emit("=" * 70)
     if not math.isnan(metrics["Overshoot_media_pct"]):
         ov_media = metrics['Overshoot_media_pct']
         pct_dentro = metrics['Overshoot_pct_dentro']
-        status = "✓ OK" if pct_dentro >= 80 else "⚠ Revisar tuning PID"
-        lines.append(f"Overshoot promedio: {ov_media:.2f}%")
-        lines.append(f"Casos ≤{OVERSHOOT_OK_PCT}%: {pct_dentro:.1f}% {status}")
-        lines.append(f"Límite objetivo: ≤{OVERSHOOT_OK_PCT}%")
+        status = f"{CHECK} OK" if pct_dentro >= 80 else f"{WARN} Revisar tuning PID"
+        emit(f"Overshoot promedio: {ov_media:.2f}%")
+        emit(f"Casos ≤{OVERSHOOT_OK_PCT}%: {pct_dentro:.1f}% {status}")
+        emit(f"Límite objetivo: ≤{OVERSHOOT_OK_PCT}%")
     
     # Sección de tiempo
-    lines.append("\n" + "=" * 70)
-    lines.append("4. TIEMPO DE RESPUESTA")
-    lines.append("=" * 70)
+    emit("\n" + "=" * 70)
+    emit("4. TIEMPO DE RESPUESTA")
+    emit("=" * 70)
     if not math.isnan(metrics["Tiempo_media_ms"]):
         t_media = metrics['Tiempo_media_ms']
         t_std = metrics.get('Tiempo_std_ms', np.nan)
         pct_cumple = metrics['Tiempo_pct_cumple']
-        status = "✓ OK" if pct_cumple >= 90 else "⚠ Optimizar"
+        status = f"{CHECK} OK" if pct_cumple >= 90 else f"{WARN} Optimizar"
         
-        lines.append(f"Tiempo promedio: {t_media:.1f} ± {t_std:.1f} ms")
-        lines.append(f"Casos ≤{TIME_TARGET_MS}ms: {pct_cumple:.1f}% {status}")
-        lines.append(f"Objetivo: ≤{TIME_TARGET_MS}ms")
+        emit(f"Tiempo promedio: {t_media:.1f} ± {t_std:.1f} ms")
+        emit(f"Casos ≤{TIME_TARGET_MS}ms: {pct_cumple:.1f}% {status}")
+        emit(f"Objetivo: ≤{TIME_TARGET_MS}ms")
     
     # Sección de repetibilidad
     if len(rep_table) > 0:
-        lines.append("\n" + "=" * 70)
-        lines.append("5. REPETIBILIDAD Y CAPACIDAD DEL PROCESO")
-        lines.append("=" * 70)
+        emit("\n" + "=" * 70)
+        emit("5. REPETIBILIDAD Y CAPACIDAD DEL PROCESO")
+        emit("=" * 70)
         
-        worst = rep_table.sort_values(by=rep_table.columns[-1]).iloc[0]
-        best = rep_table.sort_values(by=rep_table.columns[-1], ascending=False).iloc[0]
         cpk_col = rep_table.columns[-1]
+        worst = rep_table.loc[rep_table[cpk_col].idxmin()]
+        best = rep_table.loc[rep_table[cpk_col].idxmax()]
         
-        lines.append(f"\nMejor Cpk: {best[cpk_col]:.2f} (Objeto: {best['Objeto']}, "
-                    f"objetivo: {best['Posicion_Objetivo_mm']}mm)")
-        lines.append(f"Peor Cpk: {worst[cpk_col]:.2f} (Objeto: {worst['Objeto']}, "
-                    f"objetivo: {worst['Posicion_Objetivo_mm']}mm)")
+        emit(f"\nMejor Cpk: {best[cpk_col]:.2f} (Objeto: {best['Objeto']}, "
+            f"objetivo: {best['Posicion_Objetivo_mm']}mm)")
+        emit(f"Peor Cpk: {worst[cpk_col]:.2f} (Objeto: {worst['Objeto']}, "
+            f"objetivo: {worst['Posicion_Objetivo_mm']}mm)")
         
         cpk_val = worst[cpk_col]
         if cpk_val >= CPK_MIN_OBJ:
-            status = f"✓ Proceso capaz (Cpk ≥ {CPK_MIN_OBJ})"
+            status = f"{CHECK} Proceso capaz (Cpk ≥ {CPK_MIN_OBJ})"
         elif cpk_val >= 1.0:
-            status = f"⚠ Proceso marginal (1.0 ≤ Cpk < {CPK_MIN_OBJ})"
+            status = f"{WARN} Proceso marginal (1.0 ≤ Cpk < {CPK_MIN_OBJ})"
         else:
-            status = "✗ Proceso no capaz (Cpk < 1.0) - Requiere mejora"
+            status = f"{CROSS} Proceso no capaz (Cpk < 1.0) - Requiere mejora"
         
-        lines.append(f"\nEvaluación: {status}")
-        lines.append(f"Desviación estándar (peor caso): {worst['Std_mm']:.4f} mm")
+        emit(f"\nEvaluación: {status}")
+        emit(f"Desviación estándar (peor caso): {worst['Std_mm']:.4f} mm")
         
         # Resumen por objeto
-        lines.append(f"\nResumen por objeto:")
-        for _, row in rep_table.iterrows():
-            lines.append(f"  - {row['Objeto']} ({row['Posicion_Objetivo_mm']}mm): "
-                        f"σ={row['Std_mm']:.4f}mm, Cpk={row[cpk_col]:.2f}")
+        emit(f"\nResumen por objeto:")
+        # Formato numérico aplicado por columna antes de armar cada línea
+        obj = rep_table['Objeto'].tolist()
+        pos = rep_table['Posicion_Objetivo_mm'].tolist()
+        std_fmt = rep_table['Std_mm'].map(_F4).tolist()
+        cpk_fmt = rep_table[cpk_col].map(_F2).tolist()
+        for o, p, sd, c in zip(obj, pos, std_fmt, cpk_fmt):
+            emit(f"  - {o} ({p}mm): σ={sd}mm, Cpk={c}")
     
     # Análisis por objeto
     if len(obj_table) > 0:
-        lines.append("\n" + "=" * 70)
-        lines.append("6. DESEMPEÑO POR TIPO DE OBJETO")
-        lines.append("=" * 70)
-        for _, row in obj_table.iterrows():
-            lines.append(f"\n{row['Objeto']} ({row['Masa_g']}g):")
-            lines.append(f"  - Pruebas: {row['n_pruebas']}")
-            lines.append(f"  - Éxito: {row['Tasa_Exito_%']:.1f}%")
-            lines.append(f"  - Fuerza media: {row['Fuerza_Media_N']:.3f}N")
-            lines.append(f"  - Tiempo medio: {row['Tiempo_Media_ms']:.1f}ms")
+        emit("\n" + "=" * 70)
+        emit("6. DESEMPEÑO POR TIPO DE OBJETO")
+        emit("=" * 70)
+        tasa_fmt = obj_table['Tasa_Exito_%'].map('{:.1f}'.format).tolist()
+        fuerza_fmt = obj_table['Fuerza_Media_N'].map('{:.3f}'.format).tolist()
+        tiempo_fmt = obj_table['Tiempo_Media_ms'].map('{:.1f}'.format).tolist()
+        out.writelines(
+            f"\n{o} ({masa}g):\n"
+            f"  - Pruebas: {n}\n"
+            f"  - Éxito: {tasa_obj}%\n"
+            f"  - Fuerza media: {fuerza}N\n"
+            f"  - Tiempo medio: {tiempo}ms\n"
+            for o, masa, n, tasa_obj, fuerza, tiempo in zip(
+                obj_table['Objeto'].tolist(), obj_table['Masa_g'].tolist(),
+                obj_table['n_pruebas'].tolist(), tasa_fmt, fuerza_fmt, tiempo_fmt
+            )
+        )
     
     # Recomendaciones
-    lines.append("\n" + "=" * 70)
-    lines.append("7. RECOMENDACIONES")
-    lines.append("=" * 70)
+    emit("\n" + "=" * 70)
+    emit("7. RECOMENDACIONES")
+    emit("=" * 70)
     
     recommendations = []
     
     if tasa < SUCCESS_TARGET_PCT:
-        recommendations.append("⚠ Mejorar tasa de éxito: revisar setpoints de fuerza bajos")
+        recommendations.append(f"{WARN} Mejorar tasa de éxito: revisar setpoints de fuerza bajos")
     
     if not math.isnan(metrics.get('Overshoot_pct_dentro', np.nan)) and metrics['Overshoot_pct_dentro'] < 80:
-        recommendations.append("⚠ Ajustar parámetros PID para reducir overshoot")
+        recommendations.append(f"{WARN} Ajustar parámetros PID para reducir overshoot")
     
     if not math.isnan(metrics.get('Tiempo_pct_cumple', np.nan)) and metrics['Tiempo_pct_cumple'] < 90:
-        recommendations.append("⚠ Optimizar tiempo de respuesta")
+        recommendations.append(f"{WARN} Optimizar tiempo de respuesta")
     
     if len(rep_table) > 0:
-        worst_cpk = rep_table[cpk_col].min()
+        worst_cpk = worst[cpk_col]
         if worst_cpk < CPK_MIN_OBJ:
-            recommendations.append(f"⚠ Mejorar repetibilidad (Cpk objetivo: {CPK_MIN_OBJ})")
+            recommendations.append(f"{WARN} Mejorar repetibilidad (Cpk objetivo: {CPK_MIN_OBJ})")
     
     if len(recommendations) == 0:
-        lines.append("✓ Sistema dentro de especificaciones. Mantener monitoreo continuo.")
+        emit(f"{CHECK} Sistema dentro de especificaciones. Mantener monitoreo continuo.")
     else:
         for rec in recommendations:
-            lines.append(rec)
+            emit(rec)
     
     # Sección de análisis ANOVA
     if anova_results is not None and len(anova_results) > 0:
-        lines.append("\n" + "=" * 70)
-        lines.append("8. ANÁLISIS ANOVA - DIFERENCIAS ENTRE TIPOS DE PRUEBA")
-        lines.append("=" * 70)
+        emit("\n" + "=" * 70)
+        emit("8. ANÁLISIS ANOVA - DIFERENCIAS ENTRE TIPOS DE PRUEBA")
+        emit("=" * 70)
         
-        for _, row in anova_results.iterrows():
-            var = row['Variable']
-            lines.append(f"\n{var}:")
+        def anova_entry(var, f_stat, p_val, significativo, n_grupos, interpretacion, group_stats):
+            if n_grupos < 2 or pd.isna(f_stat):
+                return f"\n{var}:\n  - {interpretacion}\n"
             
-            if row['n_grupos'] >= 2 and not pd.isna(row['F_statistic']):
-                lines.append(f"  - Estadístico F: {row['F_statistic']:.4f}")
-                lines.append(f"  - Valor p: {row['p_value']:.6f}")
-                lines.append(f"  - Significativo: {row['Significativo']}")
-                lines.append(f"  - Grupos analizados: {row['n_grupos']}")
-                lines.append(f"  - Interpretación: {row['Interpretacion']}")
-                
-                # Mostrar estadísticas por grupo si están disponibles
-                if 'Estadisticas_grupos' in row and row['Estadisticas_grupos']:
-                    lines.append("  - Estadísticas por tipo de prueba:")
-                    for grupo_stat in row['Estadisticas_grupos']:
-                        lines.append(f"    • {grupo_stat['Tipo_Prueba']}: "
-                                   f"n={grupo_stat['n']}, "
-                                   f"μ={grupo_stat['Media']:.3f}, "
-                                   f"σ={grupo_stat['Std']:.3f}")
-            else:
-                lines.append(f"  - {row['Interpretacion']}")
+            entry = (f"\n{var}:\n"
+                     f"  - Estadístico F: {_F4(f_stat)}\n"
+                     f"  - Valor p: {_F6(p_val)}\n"
+                     f"  - Significativo: {significativo}\n"
+                     f"  - Grupos analizados: {n_grupos}\n"
+                     f"  - Interpretación: {interpretacion}\n")
+            
+            # Mostrar estadísticas por grupo si están disponibles
+            if group_stats:
+                entry += "  - Estadísticas por tipo de prueba:\n" + "".join(
+                    f"    • {g['Tipo_Prueba']}: n={g['n']}, μ={g['Media']:.3f}, σ={g['Std']:.3f}\n"
+                    for g in group_stats
+                )
+            return entry
+        
+        group_stats_col = (anova_results['Estadisticas_grupos'].tolist()
+                           if 'Estadisticas_grupos' in anova_results.columns else [None] * len(anova_results))
+        out.writelines(anova_entry(*fields) for fields in zip(
+            anova_results['Variable'].tolist(), anova_results['F_statistic'].tolist(),
+            anova_results['p_value'].tolist(), anova_results['Significativo'].tolist(),
+            anova_results['n_grupos'].tolist(), anova_results['Interpretacion'].tolist(),
+            group_stats_col
+        ))
     
     # Sección de análisis de distribución normal
     if normal_analysis is not None and len(normal_analysis) > 0:
-        lines.append("\n" + "=" * 70)
-        lines.append("9. ANÁLISIS DE DISTRIBUCIÓN NORMAL Y CONTROL ESTADÍSTICO")
-        lines.append("=" * 70)
+        emit("\n" + "=" * 70)
+        emit("9. ANÁLISIS DE DISTRIBUCIÓN NORMAL Y CONTROL ESTADÍSTICO")
+        emit("=" * 70)
+        
+        # Columnas extraídas una sola vez y recorridas por índice entero
+        cols = {c: normal_analysis[c].tolist() for c in normal_analysis.columns}
+        variable, n_obs, media, desv = cols['Variable'], cols['n'], cols['Media'], cols['Desv_Std']
+        lim_inf, lim_sup = cols['Limite_Inferior_3sigma'], cols['Limite_Superior_3sigma']
+        fuera, pct_fuera = cols['Casos_fuera_3sigma'], cols['Pct_fuera_3sigma']
+        sw_w, sw_p, sw_ok = cols['Shapiro_W'], cols['Shapiro_p'], cols['Es_Normal_Shapiro']
+        nt_stat, nt_p, nt_ok = cols['Normaltest_stat'], cols['Normaltest_p'], cols['Es_Normal_DAgostino']
+        interpretacion = cols['Interpretacion']
         
-        for _, row in normal_analysis.iterrows():
-            var = row['Variable']
-            lines.append(f"\n{var}:")
+        for i in range(len(normal_analysis)):
+            emit(f"\n{variable[i]}:")
             
-            if not pd.isna(row['Media']):
-                lines.append(f"  - n: {row['n']}")
-                lines.append(f"  - Media: {row['Media']:.4f}")
-                lines.append(f"  - Desviación estándar: {row['Desv_Std']:.4f}")
-                lines.append(f"  - Límites de control (±3σ): [{row['Limite_Inferior_3sigma']:.4f}, {row['Limite_Superior_3sigma']:.4f}]")
-                lines.append(f"  - Casos fuera de ±3σ: {row['Casos_fuera_3sigma']} ({row['Pct_fuera_3sigma']:.2f}%)")
+            if not pd.isna(media[i]):
+                emit(f"  - n: {n_obs[i]}")
+                emit(f"  - Media: {_F4(media[i])}")
+                emit(f"  - Desviación estándar: {_F4(desv[i])}")
+                emit(f"  - Límites de control (±3σ): [{_F4(lim_inf[i])}, {_F4(lim_sup[i])}]")
+                emit(f"  - Casos fuera de ±3σ: {fuera[i]} ({_F2(pct_fuera[i])}%)")
                 
                 # Pruebas de normalidad
-                if not pd.isna(row['Shapiro_p']):
-                    lines.append(f"  - Test Shapiro-Wilk: W={row['Shapiro_W']:.4f}, p={row['Shapiro_p']:.4f} → {row['Es_Normal_Shapiro']}")
+                if not pd.isna(sw_p[i]):
+                    emit(f"  - Test Shapiro-Wilk: W={_F4(sw_w[i])}, p={_F4(sw_p[i])} → {sw_ok[i]}")
                 
-                if not pd.isna(row['Normaltest_p']):
-                    lines.append(f"  - Test D'Agostino: stat={row['Normaltest_stat']:.4f}, p={row['Normaltest_p']:.4f} → {row['Es_Normal_DAgostino']}")
+                if not pd.isna(nt_p[i]):
+                    emit(f"  - Test D'Agostino: stat={_F4(nt_stat[i])}, p={_F4(nt_p[i])} → {nt_ok[i]}")
                 
-                lines.append(f"  - Interpretación: {row['Interpretacion']}")
+                emit(f"  - Interpretación: {interpretacion[i]}")
             else:
-                lines.append(f"  - {row['Interpretacion']}")
+                emit(f"  - {interpretacion[i]}")
     
-    lines.append("\n" + "=" * 70)
-    lines.append("Fin del reporte")
-    lines.append("=" * 70)
-    
-    return "\n".join(lines)
+    emit("\n" + "=" * 70)
+    emit("Fin del reporte")
+    emit("=" * 70)
+
+
+def config_signature(input_file):
+    """
+    Hash del archivo de entrada (ruta, tamaño y fecha de modificación) y de
+    los parámetros ajustables; cambia si se usa otro archivo, si éste se
+    modifica o si cambia la configuración.
+    """
+    st = os.stat(input_file)
+    params = (os.path.abspath(input_file), st.st_size, st.st_mtime_ns,
+              TIME_TARGET_MS, OVERSHOOT_OK_PCT, SUCCESS_TARGET_PCT,
+              TOL_POS_MM, CPK_MIN_OBJ, FORCE_TOLERANCE_N)
+    return hashlib.sha256(repr(params).encode("utf-8")).hexdigest()
+
+
+def reports_up_to_date(input_file):
+    """
+    Indica si los reportes se generaron a partir de este mismo archivo de
+    entrada y configuración (según SIGNATURE_FILE) y si siguen existiendo
+    todos los archivos que esa ejecución produjo.
+    """
+    if not os.path.exists(SIGNATURE_FILE):
+        return False
+    with open(SIGNATURE_FILE, "r", encoding="utf-8") as f:
+        signature, *outputs = f.read().split("\n")
+    if signature != config_signature(input_file):
+        return False
+    return all(os.path.exists(name) for name in outputs if name)
 
 
 def main():
     """Función principal."""
-    # Determinar archivo de entrada
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
+    # Determinar archivo de entrada (--force regenera aunque los reportes estén al día)
+    force = "--force" in sys.argv[1:]
+    args = [a for a in sys.argv[1:] if a != "--force"]
+    if args:
+        input_file = args[0]
     else:
         # Buscar archivos CSV o Excel en el directorio
         if os.path.exists("Protocolo_Simple.csv"):
@@ -851,19 +998,24 @@ def main():
             input_file = "Protocolo_Simple.xlsx"
         else:
             print("Error: No se encontró archivo de entrada.")
-            print("Uso: python analiza_gripper.py [archivo.csv o archivo.xlsx]")
+            print("Uso: python analiza_gripper.py [archivo.csv o archivo.xlsx] [--force]")
             sys.exit(1)
     
     print(f"\n{'='*70}")
     print(f"Analizando archivo: {input_file}")
     print(f"{'='*70}\n")
     
+    if not force and reports_up_to_date(input_file):
+        print("(cached) Los reportes están al día; use --force para regenerarlos.")
+        return
+    
     # Leer archivo
     try:
         if input_file.endswith('.csv'):
-            df = pd.read_csv(input_file, encoding='utf-8-sig')
+            df = read_input_csv(input_file)
         elif input_file.endswith('.xlsx'):
-            df = pd.read_excel(input_file, sheet_name="Datos")
+            excel_engine = 'calamine' if CALAMINE_AVAILABLE else None
+            df = pd.read_excel(input_file, sheet_name="Datos", engine=excel_engine)
         else:
             print("Error: Formato de archivo no soportado. Use CSV o XLSX.")
             sys.exit(1)
@@ -880,91 +1032,106 @@ def main():
     # Limpieza inicial
     print(f"Registros cargados: {len(df)}")
     
+    # Conversión numérica única; se escribe de vuelta en df para que los
+    # análisis posteriores reciban columnas ya tipadas
+    numeric = {col: pd.to_numeric(df[col], errors="coerce") for col in NUMERIC_COLS if col in df.columns}
+    df = df.assign(**numeric)
+    
+    # Columnas base como arrays numéricos
+    sp = numeric["Setpoint_Fuerza_N"].to_numpy()
+    fp = numeric["Fuerza_Pico_N"].to_numpy()
+    fm = numeric["Fuerza_Medida_N"].to_numpy()
+    
     # Calcular overshoot
-    df["Overshoot_pct"] = df.apply(
-        lambda r: compute_overshoot(r["Setpoint_Fuerza_N"], r["Fuerza_Pico_N"]), 
-        axis=1
-    )
+    df["Overshoot_pct"] = compute_overshoot(sp, fp)
     
     # Calcular error de fuerza
-    df["Error_Fuerza_N"] = df.apply(
-        lambda r: compute_error(r["Fuerza_Medida_N"], r["Setpoint_Fuerza_N"]), 
-        axis=1
-    )
+    err = compute_error(fm, sp)
+    df["Error_Fuerza_N"] = err
     
     # Métricas globales
     metrics = {}
     metrics["n_total"] = len(df)
     
-    exito_series = pd.to_numeric(df["Exito_Agarre_1o0"], errors="coerce").fillna(0)
+    exito_series = numeric["Exito_Agarre_1o0"].fillna(0)
     metrics["n_exitos"] = int(exito_series.sum())
     metrics["tasa_exito_pct"] = 100.0 * exito_series.mean()
     
+    # Media y desviación de todas las columnas en una sola agregación; min/max
+    # se toman de cada Series para conservar su dtype (los enteros siguen
+    # siendo enteros en reporte_metricas.csv)
+    nums = df[["Fuerza_Medida_N", "Error_Fuerza_N", "Overshoot_pct", "Tiempo_Respuesta_ms"]]
+    desc = nums.agg(['mean', 'std'])
+    
     # Fuerza
-    f_medida = pd.to_numeric(df["Fuerza_Medida_N"], errors="coerce")
-    metrics["Fuerza_media"] = f_medida.mean()
-    metrics["Fuerza_std"] = f_medida.std(ddof=1)
-    metrics["Fuerza_min"] = f_medida.min()
-    metrics["Fuerza_max"] = f_medida.max()
+    metrics["Fuerza_media"] = desc.loc['mean', "Fuerza_Medida_N"]
+    metrics["Fuerza_std"] = desc.loc['std', "Fuerza_Medida_N"]
+    metrics["Fuerza_min"] = nums["Fuerza_Medida_N"].min()
+    metrics["Fuerza_max"] = nums["Fuerza_Medida_N"].max()
     
     # Error de fuerza
-    error_fuerza = pd.to_numeric(df["Error_Fuerza_N"], errors="coerce")
-    metrics["Error_Fuerza_media"] = error_fuerza.mean()
-    metrics["Error_Fuerza_std"] = error_fuerza.std(ddof=1)
-    metrics["Error_Fuerza_pct_dentro"] = 100.0 * error_fuerza.apply(
-        lambda x: 1 if (not np.isnan(x) and abs(x) <= FORCE_TOLERANCE_N) else 0
-    ).mean()
+    metrics["Error_Fuerza_media"] = desc.loc['mean', "Error_Fuerza_N"]
+    metrics["Error_Fuerza_std"] = desc.loc['std', "Error_Fuerza_N"]
+    metrics["Error_Fuerza_pct_dentro"] = _pct_within(np.abs(err), FORCE_TOLERANCE_N)
     
     # Overshoot
-    ov = pd.to_numeric(df["Overshoot_pct"], errors="coerce")
-    metrics["Overshoot_media_pct"] = ov.mean()
-    metrics["Overshoot_std_pct"] = ov.std(ddof=1)
-    metrics["Overshoot_pct_dentro"] = 100.0 * ov.apply(
-        lambda x: 1 if (not np.isnan(x) and x <= OVERSHOOT_OK_PCT) else 0
-    ).mean()
+    metrics["Overshoot_media_pct"] = desc.loc['mean', "Overshoot_pct"]
+    metrics["Overshoot_std_pct"] = desc.loc['std', "Overshoot_pct"]
+    metrics["Overshoot_pct_dentro"] = _pct_within(nums["Overshoot_pct"].to_numpy(), OVERSHOOT_OK_PCT)
     
     # Tiempo
-    t_resp = pd.to_numeric(df["Tiempo_Respuesta_ms"], errors="coerce")
-    metrics["Tiempo_media_ms"] = t_resp.mean()
-    metrics["Tiempo_std_ms"] = t_resp.std(ddof=1)
-    metrics["Tiempo_min_ms"] = t_resp.min()
-    metrics["Tiempo_max_ms"] = t_resp.max()
-    metrics["Tiempo_pct_cumple"] = 100.0 * t_resp.apply(
-        lambda x: 1 if (not np.isnan(x) and x <= TIME_TARGET_MS) else 0
-    ).mean()
+    metrics["Tiempo_media_ms"] = desc.loc['mean', "Tiempo_Respuesta_ms"]
+    metrics["Tiempo_std_ms"] = desc.loc['std', "Tiempo_Respuesta_ms"]
+    metrics["Tiempo_min_ms"] = nums["Tiempo_Respuesta_ms"].min()
+    metrics["Tiempo_max_ms"] = nums["Tiempo_Respuesta_ms"].max()
+    metrics["Tiempo_pct_cumple"] = _pct_within(nums["Tiempo_Respuesta_ms"].to_numpy(), TIME_TARGET_MS)
     
     # Temperatura
-    temp_min = pd.to_numeric(df["Temp_Min_C"], errors="coerce")
-    temp_max = pd.to_numeric(df["Temp_Max_C"], errors="coerce")
-    metrics["Temp_Min_C"] = temp_min.min()
-    metrics["Temp_Max_C"] = temp_max.max()
-    
-    # Análisis por tipo de prueba
-    print("\nAnalizando por tipo de prueba...")
-    test_type_table = analyze_by_test_type(df)
-    
-    # Análisis por objeto
-    print("Analizando por tipo de objeto...")
-    obj_table = analyze_by_object(df)
-    
-    # Análisis de repetibilidad
-    print("Analizando repetibilidad...")
-    df_rep = df[df["Tipo_Prueba"].astype(str).str.lower() == "repetibilidad"].copy()
-    rep_table = analyze_repeatability(df_rep, TOL_POS_MM)
-    
-    # Análisis ANOVA por tipo de prueba
-    print("Realizando análisis ANOVA por tipo de prueba...")
-    anova_results = analyze_anova_by_test_type(df)
-    
-    # Análisis de distribución normal
-    print("Analizando distribución normal y límites de control...")
-    normal_analysis = analyze_normal_distribution(df)
+    metrics["Temp_Min_C"] = numeric["Temp_Min_C"].min()
+    metrics["Temp_Max_C"] = numeric["Temp_Max_C"].max()
+    
+    # Filtro categórico: solo se pasan a minúsculas las categorías (pocas) y la
+    # comparación por fila se hace sobre los códigos enteros. No hace falta
+    # copiar: analyze_repeatability trabaja sobre su propia copia
+    tipo = df["Tipo_Prueba"].astype("category")
+    cats = tipo.cat.categories
+    df_rep = df[tipo.isin(cats[cats.astype(str).str.lower() == "repetibilidad"])]
+    
+    # Los análisis son independientes y solo leen df: se ejecutan en paralelo
+    # (pandas/NumPy/scipy liberan el GIL en sus núcleos en C). El avance se
+    # informa a medida que termina cada análisis
+    print("\nEjecutando análisis...")
+    with ThreadPoolExecutor(max_workers=5) as ex:
+        fut_tt = ex.submit(analyze_by_test_type, df)
+        fut_obj = ex.submit(analyze_by_object, df)
+        fut_rep = ex.submit(analyze_repeatability, df_rep, TOL_POS_MM)
+        fut_anova = ex.submit(analyze_anova_by_test_type, df)
+        fut_norm = ex.submit(analyze_normal_distribution, df)
+        steps = {
+            fut_tt: "Análisis por tipo de prueba",
+            fut_obj: "Análisis por tipo de objeto",
+            fut_rep: "Análisis de repetibilidad",
+            fut_anova: "Análisis ANOVA por tipo de prueba",
+            fut_norm: "Análisis de distribución normal y límites de control",
+        }
+        for fut in as_completed(steps):
+            if fut.exception() is None:
+                print(f"✓ {steps[fut]}")
+        
+        test_type_table = fut_tt.result()
+        obj_table = fut_obj.result()
+        rep_table = fut_rep.result()
+        anova_results = fut_anova.result()
+        normal_analysis = fut_norm.result()
     
     # Guardar resultados
     print("\nGuardando resultados...")
     
-    report = pd.DataFrame([metrics])
-    report.to_csv("reporte_metricas.csv", index=False, encoding="utf-8-sig")
+    # Reporte de una sola fila: csv.DictWriter evita construir un DataFrame
+    with open("reporte_metricas.csv", "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=list(metrics.keys()), lineterminator="\n")
+        writer.writeheader()
+        writer.writerow({k: ("" if isinstance(v, float) and math.isnan(v) else v) for k, v in metrics.items()})
     print("✓ reporte_metricas.csv")
     
     if len(test_type_table) > 0:
@@ -989,25 +1156,46 @@ def main():
         print("✓ reporte_distribucion_normal.csv")
     
     # Guardar datos procesados con columnas calculadas
-    df_output = df.copy()
-    df_output.to_csv("datos_procesados.csv", index=False, encoding="utf-8-sig")
+    # Escritura por bloques de filas: memoria acotada para archivos grandes
+    df.to_csv("datos_procesados.csv", index=False, encoding="utf-8-sig", chunksize=10000)
     print("✓ datos_procesados.csv")
     
     # Generar interpretación
     print("\nGenerando interpretación...")
-    interpretation = generate_interpretation(metrics, rep_table, obj_table, df, anova_results, normal_analysis)
-    
     with open("interpretacion.txt", "w", encoding="utf-8") as f:
-        f.write(interpretation)
+        generate_interpretation(f, metrics, rep_table, obj_table, df, anova_results, normal_analysis)
     print("✓ interpretacion.txt")
     
-    # Generar gráficos
+    # Generar gráficos (algunos se omiten según los datos: se registra la
+    # fecha previa de cada imagen para saber cuáles se escribieron ahora)
+    plot_files = ["analisis_gripper.png", "distribucion_normal.png", "anova_boxplots.png"]
+    plot_mtimes = {name: os.stat(name).st_mtime_ns if os.path.exists(name) else None
+                   for name in plot_files}
     if PLOT_AVAILABLE:
         print("\nGenerando gráficos...")
         generate_plots(df)
         generate_distribution_plots(df, normal_analysis)
         generate_anova_plots(df, anova_results)
     
+    # Archivos producidos en esta ejecución; se registran junto a la firma
+    # (al final, para que una ejecución interrumpida no quede como vigente)
+    outputs = ["reporte_metricas.csv"]
+    if len(test_type_table) > 0:
+        outputs.append("reporte_por_tipo_prueba.csv")
+    if len(obj_table) > 0:
+        outputs.append("reporte_por_objeto.csv")
+    if len(rep_table) > 0:
+        outputs.append("reporte_repetibilidad.csv")
+    if len(anova_results) > 0:
+        outputs.append("reporte_anova.csv")
+    if len(normal_analysis) > 0:
+        outputs.append("reporte_distribucion_normal.csv")
+    outputs += ["datos_procesados.csv", "interpretacion.txt"]
+    outputs += [name for name in plot_files
+                if os.path.exists(name) and os.stat(name).st_mtime_ns != plot_mtimes[name]]
+    with open(SIGNATURE_FILE, "w", encoding="utf-8") as f:
+        f.write("\n".join([config_signature(input_file)] + outputs))
+    
     # Mostrar resumen en consola
     print("\n" + "="*70)
     print("RESUMEN EJECUTIVO")
@@ -1027,21 +1215,8 @@ def main():
     print("="*70)
     print("\n✓ Análisis completado exitosamente!")
     print(f"\nArchivos generados en: {os.path.abspath('.')}")
-    print("  - reporte_metricas.csv")
-    print("  - reporte_por_tipo_prueba.csv")
-    print("  - reporte_por_objeto.csv")
-    if len(rep_table) > 0:
-        print("  - reporte_repetibilidad.csv")
-    if len(anova_results) > 0:
-        print("  - reporte_anova.csv")
-    if len(normal_analysis) > 0:
-        print("  - reporte_distribucion_normal.csv")
-    print("  - datos_procesados.csv")
-    print("  - interpretacion.txt")
-    if PLOT_AVAILABLE:
-        print("  - analisis_gripper.png")
-        print("  - distribucion_normal.png")
-        print("  - anova_boxplots.png")
+    for name in outputs:
+        print(f"  - {name}")
     print("\n")
 
 
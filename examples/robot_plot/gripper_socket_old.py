@@ -1,4 +1,7 @@
 import socket
+import select
+import threading
+import time
  
 HOST = "192.168.0.101"
 PORT = 23
@@ -6,18 +9,104 @@ PORT = 23
 def read_until_idle(sock, idle_timeout=1):
     """Lee datos hasta que no llegue nada durante idle_timeout segundos"""
     sock.settimeout(idle_timeout)
-    full_response = ""
+    full_response = bytearray()
     
     try:
         while True:
-            data = sock.recv(2048)
+            data = sock.recv(4096)
             if not data:
                 break
-            full_response += data.decode()
+            full_response.extend(data)
     except socket.timeout:
         pass  # Timeout significa que ya no hay más datos
     
-    return full_response
+    # Decodificar una sola vez (evita cortar caracteres UTF-8 entre paquetes)
+    return full_response.decode('utf-8', errors='ignore')
+ 
+# Evita que las respuestas se mezclen con el prompt en la consola
+print_lock = threading.Lock()
+ 
+RESPONSE_TIMEOUT = 1.0  # Espera máxima por la respuesta a un comando
+IDLE_TIMEOUT = 0.3      # Silencio tras el cual la respuesta se da por terminada
+ 
+# Estado compartido con el hilo principal: momento de envío del último comando
+# sin respuesta (None si no hay) y si el cursor quedó tras el prompt
+pending_since = None
+at_prompt = False
+ 
+# Par de sockets para despertar al hilo lector cuando se envía un comando
+# mientras está bloqueado esperando datos (socketpair y no os.pipe para que
+# select funcione también en Windows)
+wake_r, wake_w = socket.socketpair()
+ 
+def show(text):
+    """Imprime una línea de respuesta (con print_lock tomado)"""
+    global at_prompt
+    # Si el cursor está tras el prompt, empezar en una línea nueva
+    print(("\n" if at_prompt else "") + text)
+    at_prompt = False
+ 
+def reader_thread(sock):
+    """
+    Muestra cada línea recibida en cuanto llega, sin esperar al input().
+    Cuando la respuesta termina (IDLE_TIMEOUT sin datos) muestra lo que quedó
+    sin salto de línea y vuelve a dibujar el prompt; es el único que lo dibuja
+    """
+    global pending_since, at_prompt
+    buffer = bytearray()
+    received = True  # Así el primer silencio dibuja el prompt inicial
+    
+    while True:
+        # Sin respuesta pendiente ni nada recibido, bloquear sin límite
+        if received:
+            timeout = IDLE_TIMEOUT
+        elif pending_since is not None:
+            timeout = max(0.0, pending_since + RESPONSE_TIMEOUT - time.monotonic())
+        else:
+            timeout = None
+        
+        try:
+            ready, _, _ = select.select([sock, wake_r], [], [], timeout)
+            if wake_r in ready:
+                wake_r.recv(64)
+                continue  # Recalcular el timeout con el comando pendiente
+            data = sock.recv(4096) if ready else None
+        except (OSError, ValueError):
+            break  # Socket cerrado desde el hilo principal
+        
+        if data is None:
+            # Respuesta terminada: mostrar lo que llegó sin salto de línea
+            with print_lock:
+                partial = buffer.decode('utf-8', errors='ignore').strip()
+                if partial:
+                    show(f"Response: {partial}")
+                elif not received:
+                    show("No response received")
+                buffer.clear()
+                if not received:
+                    pending_since = None  # Venció la espera de este comando
+                received = False
+                print("> ", end="", flush=True)
+                at_prompt = True
+            continue
+        
+        if not data:
+            with print_lock:
+                show("Conexión cerrada por el dispositivo.")
+            break
+        
+        pending_since = None
+        received = True
+        buffer.extend(data)
+        while True:
+            idx = buffer.find(b"\n")
+            if idx < 0:
+                break
+            line = buffer[:idx].decode('utf-8', errors='ignore').strip()
+            del buffer[:idx + 1]
+            if line:
+                with print_lock:
+                    show(f"Response: {line}")
  
 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     s.connect((HOST, PORT))
@@ -27,19 +116,21 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
     welcome = read_until_idle(s, idle_timeout=0.5)
     if welcome:
         print(welcome.strip())
+    
+    # Las respuestas se imprimen desde el hilo lector conforme llegan
+    s.settimeout(None)
+    threading.Thread(target=reader_thread, args=(s,), daemon=True).start()
  
+    # El prompt lo dibuja el hilo lector al terminar cada respuesta
     while True:
-        cmd = input("> ")
+        cmd = input()
+        with print_lock:
+            at_prompt = False
         if cmd.lower() in ("exit", "quit"):
             break
  
+        # Marcar antes de enviar para que una respuesta rápida lo limpie
+        pending_since = time.monotonic()
         s.sendall((cmd + "\n").encode())
-        
-        # Leer toda la respuesta con un timeout más largo
-        response = read_until_idle(s, idle_timeout=1.0)
-        
-        if response:
-            print("Response:", response.strip())
-        else:
-            print("No response received")
+        wake_w.send(b"\0")
  
\ No newline at end of file
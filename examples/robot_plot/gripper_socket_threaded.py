@@ -1,12 +1,31 @@
 import socket
+import selectors
+import sys
 import threading
 import time
 import queue
-from datetime import datetime
+from collections import deque
 
 HOST = "192.168.0.100"
 PORT = 23
 
+# Caché (segundo, "HH:MM:SS") del último segundo formateado. Es una tupla
+# inmutable que se lee y reemplaza de una vez: los hilos de envío y de consumo
+# la comparten y nunca ven un segundo con el texto de otro
+_ts_cache = (None, "")
+
+def format_ts(ts):
+    """Formatea un time.time() como HH:MM:SS.mmm (strftime una vez por segundo)"""
+    global _ts_cache
+    sec = int(ts)
+    cached = _ts_cache
+    if cached[0] != sec:
+        cached = (sec, time.strftime("%H:%M:%S", time.localtime(sec)))
+        # Registros atrasados no desplazan al segundo más reciente
+        if cached[0] > (_ts_cache[0] or 0):
+            _ts_cache = cached
+    return f"{cached[1]}.{int((ts - sec) * 1000):03d}"
+
 class GripperSocketMonitor:
     def __init__(self, host=HOST, port=PORT):
         self.host = host
@@ -17,12 +36,22 @@ class GripperSocketMonitor:
         
         # Colas para comunicación entre hilos
         self.send_queue = queue.Queue()
-        self.receive_queue = queue.Queue()
+        # receive_queue es SPSC (un productor: hilo receptor; un consumidor:
+        # hilo principal). El consumidor la vacía intercambiándola por un
+        # deque nuevo; el lock solo protege ese intercambio y el extend del
+        # productor (uno por recv, no uno por mensaje)
+        self.receive_queue = deque(maxlen=10000)
+        self._recv_lock = threading.Lock()
+        self._recv_evt = threading.Event()
         
         # Hilos separados
         self.sender_thread = None
         self.receiver_thread = None
         
+        # Par de sockets para despertar al receptor al detener el monitor
+        self._wake_r = None
+        self._wake_w = None
+        
     def connect(self):
         """Conecta al dispositivo"""
         try:
@@ -31,6 +60,18 @@ class GripperSocketMonitor:
             self.connected = True
             print(f"✓ Conectado a {self.host}:{self.port}")
             
+            # Comandos cortos: sin Nagle ni ACK retardado, y keepalive para
+            # detectar enlaces caídos sin sondear
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for opt, value in (("TCP_KEEPIDLE", 10), ("TCP_KEEPINTVL", 5), ("TCP_KEEPCNT", 3)):
+                if hasattr(socket, opt):
+                    try:
+                        self.socket.setsockopt(socket.IPPROTO_TCP, getattr(socket, opt), value)
+                    except OSError:
+                        pass
+            self._quickack()
+            
             # Configurar timeout para recepción no bloqueante
             self.socket.settimeout(0.1)
             
@@ -39,6 +80,14 @@ class GripperSocketMonitor:
             print(f"✗ Error al conectar: {e}")
             return False
     
+    def _quickack(self):
+        """Activa TCP_QUICKACK (solo Linux; el kernel lo desactiva tras cada recv)"""
+        if hasattr(socket, "TCP_QUICKACK"):
+            try:
+                self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            except OSError:
+                pass
+    
     def start_threads(self):
         """Inicia los hilos de envío y recepción"""
         if not self.connected:
@@ -47,6 +96,9 @@ class GripperSocketMonitor:
             
         self.running = True
         
+        # socketpair (y no os.pipe) para que el selector funcione también en Windows
+        self._wake_r, self._wake_w = socket.socketpair()
+        
         # Iniciar hilo de recepción
         self.receiver_thread = threading.Thread(target=self._receiver_worker, daemon=True)
         self.receiver_thread.start()
@@ -60,38 +112,62 @@ class GripperSocketMonitor:
     
     def _receiver_worker(self):
         """Hilo que recibe datos continuamente"""
-        buffer = ""
+        # Buffer de bytes: solo se decodifican líneas completas, así no se
+        # cortan caracteres UTF-8 repartidos entre dos recv()
+        buffer = bytearray()
+        chunk = bytearray(4096)
+        view = memoryview(chunk)
+        
+        # Bloquear en el selector hasta que lleguen datos o stop() escriba en
+        # el socket de aviso; sin timeouts, el hilo no despierta si no hay tráfico.
+        # El socket sigue en modo bloqueante porque el hilo de envío usa sendall
+        self.socket.settimeout(None)
+        sel = selectors.DefaultSelector()
+        sel.register(self.socket, selectors.EVENT_READ)
+        sel.register(self._wake_r, selectors.EVENT_READ)
         
         while self.running and self.connected:
             try:
-                # Recibir datos con timeout pequeño
-                data = self.socket.recv(1024).decode('utf-8', errors='ignore')
-                if not data:
+                events = sel.select()
+                if any(key.fileobj is self._wake_r for key, _ in events):
+                    break
+                
+                n = self.socket.recv_into(view)
+                if n == 0:
                     print("⚠️ Conexión cerrada por el servidor")
                     self.connected = False
                     break
                 
-                buffer += data
+                buffer += view[:n]
+                self._quickack()
                 
                 # Procesar líneas completas
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    line = line.strip()
+                batch = []
+                idx = buffer.find(b'\n')
+                while idx >= 0:
+                    line = buffer[:idx].decode('utf-8', errors='ignore').strip()
+                    del buffer[:idx + 1]
+                    idx = buffer.find(b'\n')
                     if line:
-                        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                        # Poner en cola para procesamiento
-                        self.receive_queue.put({
-                            'timestamp': timestamp,
+                        # Marca de tiempo cruda; se formatea solo al mostrarla
+                        batch.append({
+                            'ts': time.time(),
                             'data': line
                         })
+                
+                # Publicar todas las líneas de este recv de una vez
+                if batch:
+                    with self._recv_lock:
+                        self.receive_queue.extend(batch)
+                    self._recv_evt.set()
                         
-            except socket.timeout:
-                # Timeout normal, continuar
-                continue
             except Exception as e:
                 if self.running:
                     print(f"❌ Error en recepción: {e}")
                 break
+        
+        view.release()
+        sel.close()
     
     def _sender_worker(self):
         """Hilo que envía comandos desde la cola"""
@@ -102,13 +178,34 @@ class GripperSocketMonitor:
                 
                 if command == "STOP_THREAD":
                     break
-                    
-                # Enviar comando
-                self.socket.sendall((command + "\n").encode())
-                timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                print(f"📤 [{timestamp}] Enviado: {command}")
                 
-                self.send_queue.task_done()
+                # Agrupar los comandos ya encolados en un solo sendall
+                # (máx. 32 comandos o ~4 KiB por envío)
+                # La cola transporta bytes ya codificados (con salto de línea)
+                commands = [command]
+                buf = bytearray(command)
+                stop = False
+                while len(commands) < 32 and len(buf) < 4096:
+                    try:
+                        more = self.send_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if more == "STOP_THREAD":
+                        stop = True
+                        break
+                    commands.append(more)
+                    buf += more
+                
+                # Enviar comandos
+                self.socket.sendall(buf)
+                timestamp = format_ts(time.time())
+                for cmd in commands:
+                    print(f"📤 [{timestamp}] Enviado: {cmd.decode(errors='ignore').rstrip()}")
+                    self.send_queue.task_done()
+                
+                # La señal de parada se atiende después de enviar lo acumulado
+                if stop:
+                    break
                 
             except queue.Empty:
                 # No hay comandos, continuar
@@ -121,23 +218,27 @@ class GripperSocketMonitor:
     def send_command(self, command):
         """Envía un comando de forma no bloqueante"""
         if self.running and self.connected:
-            self.send_queue.put(command)
+            self.send_queue.put((command + "\n").encode())
             return True
         else:
             print(f"⚠️ No se puede enviar comando '{command}': no hay conexión")
             return False
     
-    def get_received_data(self):
-        """Obtiene todos los datos recibidos pendientes"""
-        data_list = []
-        try:
-            while True:
-                data = self.receive_queue.get_nowait()
-                data_list.append(data)
-        except queue.Empty:
-            pass
+    def get_received_data(self, timeout=None):
+        """
+        Obtiene todos los datos recibidos pendientes.
+        Si se indica timeout, espera hasta ese tiempo a que llegue algún dato.
+        """
+        if timeout is not None:
+            self._recv_evt.wait(timeout)
+        
+        # Limpiar el evento antes de vaciar: un dato que llegue durante el
+        # vaciado vuelve a activarlo y no se pierde la notificación
+        self._recv_evt.clear()
+        with self._recv_lock:
+            drained, self.receive_queue = self.receive_queue, deque(maxlen=self.receive_queue.maxlen)
         
-        return data_list
+        return list(drained)
     
     def stop(self):
         """Detiene los hilos y cierra la conexión"""
@@ -150,6 +251,13 @@ class GripperSocketMonitor:
         except:
             pass
         
+        # Despertar al hilo de recepción bloqueado en el selector
+        if self._wake_w:
+            try:
+                self._wake_w.send(b'\0')
+            except OSError:
+                pass
+        
         # Esperar a que terminen los hilos
         if self.sender_thread and self.sender_thread.is_alive():
             self.sender_thread.join(timeout=2)
@@ -157,6 +265,10 @@ class GripperSocketMonitor:
         if self.receiver_thread and self.receiver_thread.is_alive():
             self.receiver_thread.join(timeout=2)
         
+        for wake in (self._wake_r, self._wake_w):
+            if wake:
+                wake.close()
+        
         # Cerrar socket
         if self.socket:
             try:
@@ -167,6 +279,13 @@ class GripperSocketMonitor:
         self.connected = False
         print("✅ Monitor detenido")
 
+def write_block(header, items, indent="   "):
+    """Escribe encabezado + mensajes en una sola escritura a stdout"""
+    lines = [header] if header else []
+    lines.extend(f"{indent}[{format_ts(item['ts'])}] {item['data']}" for item in items)
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
 def interactive_mode():
     """Modo interactivo mejorado"""
     monitor = GripperSocketMonitor()
@@ -176,20 +295,22 @@ def interactive_mode():
         return
     
     # Leer mensaje de bienvenida inicial
-    welcome_data = ""
+    welcome_data = bytearray()
     start_time = time.time()
     monitor.socket.settimeout(2.0)
     
     try:
         while time.time() - start_time < 2:
-            data = monitor.socket.recv(1024).decode('utf-8', errors='ignore')
+            data = monitor.socket.recv(1024)
             if data:
-                welcome_data += data
+                welcome_data.extend(data)
             else:
                 break
     except socket.timeout:
         pass
     
+    # Decodificar una sola vez todo lo recibido
+    welcome_data = welcome_data.decode('utf-8', errors='ignore')
     if welcome_data:
         print("📄 Mensaje de bienvenida:")
         print(welcome_data.strip())
@@ -207,44 +328,67 @@ def interactive_mode():
     print("   - 'exit' o 'quit': Salir")
     print("-" * 50)
     
+    # Hilo dedicado a leer stdin de forma bloqueante. Los comandos del gripper
+    # van directo de este hilo a la cola de envío; al hilo principal solo le
+    # llegan los comandos locales (exit/quit/status/clear), que tocan la UI
+    stdin_q = deque()
+    stdin_evt = threading.Event()
+    
+    def stdin_reader():
+        while True:
+            line = sys.stdin.readline()
+            if not line:
+                stdin_q.append("exit")  # EOF en stdin: salir
+                stdin_evt.set()
+                break
+            cmd = line.strip()
+            if cmd.lower() in ("exit", "quit", "status", "clear"):
+                stdin_q.append(cmd)
+                stdin_evt.set()
+                if cmd.lower() in ("exit", "quit"):
+                    break
+            elif cmd:
+                monitor.send_command(cmd)
+    
+    threading.Thread(target=stdin_reader, daemon=True).start()
+    
     try:
         last_status_time = 0
+        salir = False
         
-        while True:
+        while not salir:
+            stdin_evt.wait(1.0)
+            stdin_evt.clear()
+            
             # Mostrar datos recibidos cada segundo
             current_time = time.time()
             if current_time - last_status_time >= 1.0:
                 received_data = monitor.get_received_data()
                 if received_data:
-                    print(f"\n📥 Datos recibidos ({len(received_data)} mensajes):")
-                    for item in received_data[-5:]:  # Mostrar últimos 5
-                        print(f"   [{item['timestamp']}] {item['data']}")
+                    # Mostrar últimos 5
+                    write_block(f"\n📥 Datos recibidos ({len(received_data)} mensajes):",
+                                received_data[-5:])
                 last_status_time = current_time
             
-            # Leer comando del usuario (con timeout)
-            import select
-            import sys
-            
-            # Verificar si hay entrada disponible
-            if select.select([sys.stdin], [], [], 0.1)[0]:
-                cmd = input("> ").strip()
+            # Procesar comandos locales del usuario
+            while stdin_q:
+                cmd = stdin_q.popleft()
+                cmd_lower = cmd.lower()
                 
-                if cmd.lower() in ("exit", "quit"):
+                if cmd_lower in ("exit", "quit"):
+                    salir = True
                     break
-                elif cmd.lower() == "status":
+                elif cmd_lower == "status":
                     received_data = monitor.get_received_data()
                     if received_data:
-                        print(f"📊 Últimos datos recibidos ({len(received_data)}):")
-                        for item in received_data:
-                            print(f"   [{item['timestamp']}] {item['data']}")
+                        write_block(f"📊 Últimos datos recibidos ({len(received_data)}):",
+                                    received_data)
                     else:
                         print("📭 No hay datos recientes")
-                elif cmd.lower() == "clear":
+                elif cmd_lower == "clear":
                     # Limpiar buffer
                     monitor.get_received_data()
                     print("🧹 Buffer limpiado")
-                elif cmd:
-                    monitor.send_command(cmd)
     
     except KeyboardInterrupt:
         print("\n\n✗ Interrumpido por el usuario")
@@ -268,11 +412,11 @@ def monitoring_mode():
     
     try:
         while True:
-            time.sleep(0.5)
-            received_data = monitor.get_received_data()
+            # Espera hasta que llegue algún dato (máx. 0.5 s) en lugar de dormir
+            received_data = monitor.get_received_data(timeout=0.5)
             
-            for item in received_data:
-                print(f"[{item['timestamp']}] {item['data']}")
+            if received_data:
+                write_block(None, received_data, indent="")
     
     except KeyboardInterrupt:
         print("\n\n✗ Saliendo del modo monitoreo")
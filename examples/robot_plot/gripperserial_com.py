@@ -5,6 +5,8 @@ TARGET_FORCE = 300  # Fuerza objetivo en gF
 MAX_SAMPLES = 5000  # Máximo de muestras a graficar
 ENABLE_MAX_SAMPLES = False  # True: limitar muestras, False: sin límite
 WINDOW_SIZE = 1000   # Tamaño de ventana deslizante para visualización (0 = mostrar todo)
+MAX_LINES_PER_FRAME = 256  # Máximo de líneas procesadas por cuadro (el resto espera al siguiente)
+ECHO_COMMANDS = True  # Mostrar cada comando enviado con su hora
 
 # ============== CONFIGURACIÓN PID GAINS ================
 PID_KP = 1.0        # Ganancia proporcional
@@ -17,17 +19,27 @@ Script para monitorear y graficar datos de fuerza del ESP32
 import serial
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
+import numpy as np
 import re
 import time
 import glob
 import os
+import logging
 import threading
-import queue
+import selectors
 from collections import deque
-from datetime import datetime
 
 # =======================================================
 
+# Registro de depuración del lazo de recepción; nivel por variable de entorno
+# (p. ej. GRIP_LOG=DEBUG). Por defecto WARNING: no se imprime nada por línea
+log = logging.getLogger('grip')
+log.setLevel(os.environ.get('GRIP_LOG', 'WARNING').upper())
+if not log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(_handler)
+
 def validate_pid_gains():
     """Valida que las ganancias PID sean valores positivos"""
     global PID_KP, PID_KI, PID_KD
@@ -52,8 +64,19 @@ def find_serial_port():
         print("✗ No se encontraron puertos serie USB/ACM")
         return None
     
-    # Ordenar por tiempo de modificación (el más reciente primero)
-    all_ports.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+    # Ordenar por tiempo de modificación (el más reciente primero). Un stat()
+    # por puerto; si el dispositivo desaparece entre glob y stat se omite
+    stamped = []
+    for port in all_ports:
+        try:
+            stamped.append((os.path.getmtime(port), port))
+        except OSError:
+            pass
+    if not stamped:
+        print("✗ No se encontraron puertos serie USB/ACM")
+        return None
+    stamped.sort(reverse=True)
+    all_ports = [port for _, port in stamped]
     
     print(f"📡 Puertos serie encontrados: {all_ports}")
     selected_port = all_ports[0]
@@ -61,19 +84,135 @@ def find_serial_port():
     
     return selected_port
 
+# Patrones de fuerza compilados una sola vez, en orden de prioridad. Son
+# patrones de bytes: se aplican a las líneas tal como llegan del puerto
+_FORCE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    rb'Grip force:\s*(\d+(?:\.\d+)?)',  # Patrón original
+    rb'Force:\s*(\d+(?:\.\d+)?)',       # Patrón alternativo 1
+    rb'force:\s*(\d+(?:\.\d+)?)',       # Patrón alternativo 2 (minúscula)
+    rb'(\d+(?:\.\d+)?)\s*gF',           # Patrón con unidad gF
+    rb'(\d+(?:\.\d+)?)\s*g',            # Patrón con unidad g
+    rb'F:\s*(\d+(?:\.\d+)?)',           # Patrón corto
+    rb'^(\d+(?:\.\d+)?)$',              # Número simple
+))
+
+# Unión de todos los patrones en una sola pasada. Si no hay coincidencia
+# ningún patrón coincide; si coincide "Grip force" (máxima prioridad) ya es
+# el resultado. Otra alternativa puede aparecer antes en la línea que un
+# patrón de más prioridad, así que en ese caso se recorre la lista en orden
+_FORCE_RE = re.compile(
+    rb'Grip force:\s*(?P<grip>\d+(?:\.\d+)?)'
+    rb'|Force:\s*(?P<force>\d+(?:\.\d+)?)'
+    rb'|(?P<gf>\d+(?:\.\d+)?)\s*gF'
+    rb'|(?P<g>\d+(?:\.\d+)?)\s*g'
+    rb'|F:\s*(?P<f>\d+(?:\.\d+)?)'
+    rb'|^(?P<bare>\d+(?:\.\d+)?)$',
+    re.IGNORECASE
+)
+
+class ForceBuffer:
+    """
+    Muestras de fuerza en un arreglo float32 contiguo.
+    Con maxlen funciona como anillo espejado (cada valor se escribe en i e
+    i+maxlen), así las últimas maxlen muestras siempre son un slice sin copia.
+    Sin maxlen crece duplicando su capacidad. total cuenta todas las muestras
+    agregadas, incluidas las que el anillo ya descartó.
+    """
+    def __init__(self, maxlen=None, capacity=MAX_SAMPLES):
+        self.maxlen = maxlen
+        size = 2 * maxlen if maxlen else capacity
+        self.buf = np.zeros(size, dtype=np.float32)
+        self.head = 0  # Próxima posición de escritura
+        self.n = 0     # Muestras válidas
+        self.total = 0 # Muestras agregadas desde el inicio
+    
+    def append(self, value):
+        self.total += 1
+        if self.maxlen:
+            self.buf[self.head] = value
+            self.buf[self.head + self.maxlen] = value
+            self.head = (self.head + 1) % self.maxlen
+            self.n = min(self.n + 1, self.maxlen)
+        else:
+            if self.n == len(self.buf):
+                self.buf = np.concatenate((self.buf, np.zeros_like(self.buf)))
+            self.buf[self.n] = value
+            self.n += 1
+    
+    def extend(self, values):
+        """Agrega un lote de muestras con escrituras vectorizadas"""
+        arr = np.asarray(values, dtype=np.float32)
+        k = len(arr)
+        self.total += k
+        if self.maxlen:
+            if k >= self.maxlen:
+                arr = arr[-self.maxlen:]
+                self.buf[:self.maxlen] = arr
+                self.buf[self.maxlen:] = arr
+                self.head = 0
+                self.n = self.maxlen
+                return
+            idx = (self.head + np.arange(k)) % self.maxlen
+            self.buf[idx] = arr
+            self.buf[idx + self.maxlen] = arr
+            self.head = (self.head + k) % self.maxlen
+            self.n = min(self.n + k, self.maxlen)
+        else:
+            while self.n + k > len(self.buf):
+                self.buf = np.concatenate((self.buf, np.zeros_like(self.buf)))
+            self.buf[self.n:self.n + k] = arr
+            self.n += k
+    
+    def clear(self):
+        self.head = 0
+        self.n = 0
+        self.total = 0
+    
+    def __len__(self):
+        return self.n
+    
+    def window(self, start=0):
+        """Devuelve las muestras desde start (en orden cronológico) sin copiar"""
+        if self.maxlen and self.n == self.maxlen:
+            return self.buf[self.head + start:self.head + self.maxlen]
+        return self.buf[start:self.n]
+
 class ESP32GripMonitor:
     def __init__(self):
         self.ser = None
-        self.force_data = deque(maxlen=MAX_SAMPLES if ENABLE_MAX_SAMPLES else None)
+        # Sin límite de muestras solo se grafica la ventana deslizante: el anillo
+        # preasignado guarda WINDOW_SIZE muestras en vez de crecer sin fin
+        if ENABLE_MAX_SAMPLES:
+            maxlen = MAX_SAMPLES
+        else:
+            maxlen = WINDOW_SIZE if WINDOW_SIZE > 0 else None
+        self.force_data = ForceBuffer(maxlen=maxlen)
         self.sample_count = 0
         self.finished = False
         
         # Threading para comunicación no bloqueante
         self.running = False
-        self.send_queue = queue.Queue()
-        self.receive_queue = queue.Queue()
+        # Un productor y un consumidor por cola: append/popleft de deque son
+        # atómicos en CPython y evitan el Lock + Condition de queue.Queue
+        self.send_queue = deque()
+        self.receive_queue = deque()
+        self._send_evt = threading.Event()
         self.receiver_thread = None
         self.sender_thread = None
+        self.io_thread = None
+        
+        # Multiplexado de E/S: selector sobre el puerto y una tubería de aviso
+        # que send_raw escribe para despertar al hilo cuando hay comandos
+        self._sel = None
+        self._wake_r = None
+        self._wake_w = None
+        
+        # Bytes recibidos aún sin línea completa
+        self._rxbuf = bytearray()
+        
+        # Comandos fijos ya codificados (se envían con send_raw)
+        self._cmd_home = b"MOVE GRIP HOME\n"
+        self._cmd_tforce = f"MOVE GRIP TFORCE {TARGET_FORCE}\n".encode()
         
     def connect(self):
         """Conecta al puerto serial"""
@@ -113,6 +252,30 @@ class ESP32GripMonitor:
             
         self.running = True
         
+        # En Windows el buffer de recepción del driver es configurable
+        if hasattr(self.ser, 'set_buffer_size'):
+            try:
+                self.ser.set_buffer_size(rx_size=65536)
+            except Exception:
+                pass
+        
+        # Un solo hilo con select() sobre el descriptor del puerto (POSIX).
+        # Si el puerto no expone fileno (p. ej. Windows) se usan los dos hilos
+        try:
+            self._sel = selectors.DefaultSelector()
+            self._sel.register(self.ser.fileno(), selectors.EVENT_READ, 'rx')
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_w, False)
+            self._sel.register(self._wake_r, selectors.EVENT_READ, 'tx')
+        except Exception:
+            self._close_selector()
+        
+        if self._sel:
+            self.io_thread = threading.Thread(target=self._io_worker, daemon=True)
+            self.io_thread.start()
+            print("✓ Hilo de E/S serial iniciado (select)")
+            return True
+        
         # Hilo de recepción
         self.receiver_thread = threading.Thread(target=self._receiver_worker, daemon=True)
         self.receiver_thread.start()
@@ -124,16 +287,77 @@ class ESP32GripMonitor:
         print("✓ Hilos de comunicación serial iniciados")
         return True
     
+    def _close_selector(self):
+        """Libera el selector y la tubería de aviso"""
+        if self._sel:
+            self._sel.close()
+            self._sel = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._wake_r = self._wake_w = None
+    
+    def _io_worker(self):
+        """Hilo único de E/S: un select() espera datos del puerto o comandos por enviar"""
+        while self.running and self.ser and self.ser.is_open:
+            try:
+                for key, _ in self._sel.select(0.5):
+                    if key.data == 'rx':
+                        # El descriptor está listo: la lectura no bloquea
+                        data = self.ser.read(min(max(self.ser.in_waiting, 1), 4096))
+                        if data:
+                            self._feed(data)
+                    else:
+                        os.read(self._wake_r, 512)
+                        while self.send_queue:
+                            command = self.send_queue.popleft()
+                            if command == "STOP_THREAD":
+                                return
+                            self._write_command(command)
+                            
+            except Exception as e:
+                if self.running:
+                    print(f"❌ Error en E/S serial: {e}")
+                break
+    
+    def _feed(self, data):
+        """Agrega bytes recibidos y encola las líneas completas"""
+        # Se encola en bytes; parse_force decodifica solo si hace falta.
+        # La búsqueda del salto de línea empieza en los bytes nuevos:
+        # la línea parcial previa ya se revisó
+        scan_from = len(self._rxbuf)
+        self._rxbuf += data
+        idx = self._rxbuf.find(b'\n', scan_from)
+        while idx >= 0:
+            line = bytes(self._rxbuf[:idx]).strip()
+            del self._rxbuf[:idx + 1]
+            if line:
+                self.receive_queue.append(line)
+            idx = self._rxbuf.find(b'\n')
+    
+    def _write_command(self, command):
+        """Escribe un comando (bytes con salto de línea) en el puerto"""
+        # Sin flush(): tcdrain bloquearía el hilo hasta vaciar la UART; el
+        # sistema operativo transmite el búfer por su cuenta
+        self.ser.write(command)
+        if ECHO_COMMANDS:
+            # time.strftime usa la hora local directamente, sin crear un datetime
+            timestamp = time.strftime("%H:%M:%S")
+            print(f"📤 [{timestamp}] Comando enviado: {command.decode(errors='ignore').rstrip()}")
+    
     def _receiver_worker(self):
         """Hilo que recibe datos continuamente del puerto serial"""
         while self.running and self.ser and self.ser.is_open:
             try:
-                if self.ser.in_waiting > 0:
-                    line = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                    if line:
-                        self.receive_queue.put(line)
-                else:
-                    time.sleep(0.01)  # Pequeña pausa si no hay datos
+                # Lectura bloqueante: espera en el kernel hasta que llegue al
+                # menos un byte (o venza el timeout del puerto, 0.1 s) y trae
+                # todo lo disponible, hasta 4 KiB por llamada. Sin sleep de sondeo
+                data = self.ser.read(min(max(self.ser.in_waiting, 1), 4096))
+                if data:
+                    self._feed(data)
                     
             except Exception as e:
                 if self.running:
@@ -144,21 +368,18 @@ class ESP32GripMonitor:
         """Hilo que envía comandos desde la cola"""
         while self.running and self.ser and self.ser.is_open:
             try:
-                command = self.send_queue.get(timeout=0.5)
+                if not self._send_evt.wait(0.5):
+                    continue
+                self._send_evt.clear()
                 
-                if command == "STOP_THREAD":
-                    break
+                while self.send_queue:
+                    command = self.send_queue.popleft()
+                    if command == "STOP_THREAD":
+                        return
                     
-                self.ser.write(f"{command}\n".encode())
-                self.ser.flush()  # Forzar envío inmediato
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                print(f"📤 [{timestamp}] Comando enviado: {command}")
-                
-                self.send_queue.task_done()
-                time.sleep(0.05)  # Pequeña pausa entre comandos
+                    # La cola transporta bytes ya codificados (con salto de línea)
+                    self._write_command(command)
                 
-            except queue.Empty:
-                continue
             except Exception as e:
                 if self.running:
                     print(f"❌ Error en envío serial: {e}")
@@ -166,71 +387,121 @@ class ESP32GripMonitor:
     
     def send_command(self, command):
         """Envía comando de forma no bloqueante"""
+        self.send_raw(f"{command}\n".encode())
+    
+    def send_raw(self, blob):
+        """Encola bytes ya codificados (incluido el salto de línea) sin reformatear"""
         if self.running and self.ser and self.ser.is_open:
-            self.send_queue.put(command)
+            self.send_queue.append(blob)
+            self._send_evt.set()
+            self._wake()
         else:
-            print(f"❌ Error: Puerto serie no disponible para enviar comando: {command}")
+            print(f"❌ Error: Puerto serie no disponible para enviar comando: {blob.decode(errors='ignore').rstrip()}")
+    
+    def _wake(self):
+        """Despierta al hilo de E/S (si se usa select)"""
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b'\0')
+            except (BlockingIOError, OSError):
+                pass  # Tubería llena: el hilo ya tiene un aviso pendiente
+    
+    # Prefijo del formato habitual del ESP32
+    _FORCE_PREFIX = b'Grip force:'
+    
+    @staticmethod
+    def _to_gf(force_value):
+        """Convierte a gF si parece estar en otras unidades"""
+        if force_value < 10:
+            force_value = force_value * 100
+        return force_value
     
     def parse_force(self, line):
-        """Parsea la línea para extraer el valor de fuerza"""
-        patterns = [
-            r'Grip force:\s*(\d+(?:\.\d+)?)',  # Patrón original
-            r'Force:\s*(\d+(?:\.\d+)?)',       # Patrón alternativo 1
-            r'force:\s*(\d+(?:\.\d+)?)',       # Patrón alternativo 2 (minúscula)
-            r'(\d+(?:\.\d+)?)\s*gF',           # Patrón con unidad gF
-            r'(\d+(?:\.\d+)?)\s*g',            # Patrón con unidad g
-            r'F:\s*(\d+(?:\.\d+)?)',           # Patrón corto
-            r'^(\d+(?:\.\d+)?)$',              # Número simple
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, line.strip(), re.IGNORECASE)
+        """Parsea la línea (bytes) para extraer el valor de fuerza"""
+        token = self.force_token(line)
+        if token is None:
+            return None
+        return self._to_gf(float(token))
+    
+    def force_token(self, line):
+        """Devuelve el número de fuerza de la línea como bytes (sin convertir)"""
+        line = line.strip()
+        
+        # Camino rápido: "Grip force: <número> [resto]" toma el primer campo
+        # sin pasar por las expresiones regulares. La
+        # validación de dígitos mantiene lo que aceptaría el patrón (sin
+        # signo ni exponente); cualquier otra forma sigue al camino general
+        if line.startswith(self._FORCE_PREFIX):
+            fields = line[len(self._FORCE_PREFIX):].split(None, 1)
+            if fields:
+                value = fields[0]
+                if value[:1].isdigit() and value.replace(b'.', b'', 1).isdigit():
+                    return value
+        
+        # Las expresiones son de bytes: no se decodifica la línea. Un byte no
+        # ASCII corta el número (\d solo acepta dígitos ASCII)
+        match = _FORCE_RE.search(line)
+        if match is None:
+            return None
+        if match.lastgroup == 'grip':
+            return match.group('grip')
+        
+        for pattern in _FORCE_PATTERNS:
+            match = pattern.search(line)
             if match:
-                force_value = float(match.group(1))
-                # Convertir a gF si parece estar en otras unidades
-                if force_value < 10:
-                    force_value = force_value * 100
-                return force_value
+                return match.group(1)
         return None
     
+    @staticmethod
+    def tokens_to_gf(tokens):
+        """Convierte un lote de números en bytes a gF con un solo parseo de NumPy"""
+        values = np.fromstring(b' '.join(tokens).decode('ascii'), dtype=np.float64, sep=' ')
+        values[values < 10] *= 100  # Misma regla que _to_gf
+        return values
+    
     def read_data(self):
-        """Lee datos de la cola de recepción (no bloqueante)"""
-        new_data_count = 0
+        """Lee datos de la cola de recepción (no bloqueante, lote acotado por cuadro)"""
+        tokens = []  # Números del cuadro; se convierten y escriben de una vez
+        debug = log.isEnabledFor(logging.DEBUG)  # Constante durante el cuadro
         
         try:
-            while True:
-                line = self.receive_queue.get_nowait()
+            for _ in range(MAX_LINES_PER_FRAME):
+                line = self.receive_queue.popleft()
                 
                 if line:
                     # Debug: mostrar línea recibida ocasionalmente
-                    if self.sample_count % 50 == 0:
-                        print(f"📥 Línea recibida: {line}")
+                    if debug and (self.sample_count + len(tokens)) % 50 == 0:
+                        log.debug("📥 Línea recibida: %s", line.decode('ascii', errors='replace'))
                     
-                    force = self.parse_force(line)
-                    if force is not None:
-                        self.force_data.append(force)
-                        self.sample_count += 1
-                        new_data_count += 1
-                        
-                        # Mostrar progreso cada 25 muestras
-                        if self.sample_count % 25 == 0:
-                            print(f"✅ Muestra {self.sample_count}: {force} gF")
-                        
-                        # Verificar si alcanzamos el máximo
-                        if ENABLE_MAX_SAMPLES and self.sample_count >= MAX_SAMPLES:
-                            if not self.finished:
-                                print(f"\n✓ Alcanzadas {MAX_SAMPLES} muestras")
-                                self.send_command("MOVE GRIP HOME")
-                                self.finished = True
+                    token = self.force_token(line)
+                    if token is not None:
+                        tokens.append(token)
                     else:
                         # Debug ocasional para líneas no parseadas
-                        if self.sample_count % 100 == 0:
-                            print(f"⚠️ No se pudo parsear fuerza de: {line[:50]}")
+                        if debug and (self.sample_count + len(tokens)) % 100 == 0:
+                            log.debug("⚠️ No se pudo parsear fuerza de: %s", line[:50].decode('ascii', errors='replace'))
         
-        except queue.Empty:
-            pass
+        except IndexError:
+            pass  # Cola vacía
         
-        return new_data_count > 0
+        if tokens:
+            forces = self.tokens_to_gf(tokens)
+            self.force_data.extend(forces)
+            
+            # Mostrar progreso cada 25 muestras
+            if log.isEnabledFor(logging.INFO):
+                first = self.sample_count + 1
+                for n in range(-(-first // 25) * 25, first + len(forces), 25):
+                    log.info("✅ Muestra %d: %s gF", n, float(forces[n - first]))
+            self.sample_count += len(forces)
+        
+        # Verificar si alcanzamos el máximo (una vez por cuadro, no por muestra)
+        if ENABLE_MAX_SAMPLES and not self.finished and self.sample_count >= MAX_SAMPLES:
+            print(f"\n✓ Alcanzadas {MAX_SAMPLES} muestras")
+            self.send_raw(self._cmd_home)
+            self.finished = True
+        
+        return len(tokens) > 0
     
     def stop(self):
         """Detiene los hilos y cierra la conexión"""
@@ -239,20 +510,27 @@ class ESP32GripMonitor:
         
         # Señal de parada al hilo de envío
         try:
-            self.send_queue.put("STOP_THREAD")
+            self.send_queue.append("STOP_THREAD")
+            self._send_evt.set()
+            self._wake()
         except:
             pass
         
         # Esperar hilos
+        if self.io_thread and self.io_thread.is_alive():
+            self.io_thread.join(timeout=2)
+        self._close_selector()
+        
         if self.sender_thread and self.sender_thread.is_alive():
             self.sender_thread.join(timeout=2)
             
         if self.receiver_thread and self.receiver_thread.is_alive():
             self.receiver_thread.join(timeout=2)
         
-        # Cerrar puerto serial
+        # Cerrar puerto serial (vaciando antes lo pendiente, p. ej. HOME)
         if self.ser and self.ser.is_open:
             try:
+                self.ser.flush()
                 self.ser.close()
             except:
                 pass
@@ -278,56 +556,140 @@ ax.set_autoscaley_on(True)
 ax.set_xlim(0, 50)
 ax.set_ylim(0, TARGET_FORCE * 2)
 
+# Línea de referencia creada una sola vez. No es animada: forma parte del fondo
+# del blit, y su visibilidad solo cambia junto con los límites de Y (que ya
+# provocan un redibujado completo), así no se repinta en cada cuadro
+target_line = ax.axhline(y=TARGET_FORCE, color='red', linestyle='--', alpha=0.8,
+                         linewidth=2, label=f'Target: {TARGET_FORCE} gF', visible=False)
+
+# Texto dinámico dentro de los ejes: con blit solo se repinta el área de los
+# ejes, así que la información por cuadro no puede ir en el título
+info_text = ax.text(0.01, 0.98, '', transform=ax.transAxes, va='top', ha='left', fontsize=10,
+                    bbox=dict(facecolor='white', alpha=0.8, edgecolor='none'))
+
+# Eje X precalculado (números de muestra 1..MAX_SAMPLES); int32 ocupa la mitad
+x_index = np.arange(1, MAX_SAMPLES + 1, dtype=np.int32)
+
+def sample_index(start, stop):
+    """Devuelve los números de muestra start+1..stop (vista si caben en x_index)"""
+    if stop <= len(x_index):
+        return x_index[start:stop]
+    # Más allá del rango precalculado solo se genera la ventana pedida
+    return np.arange(start + 1, stop + 1, dtype=np.int32)
+
+def display_data(x_data, y_data):
+    """
+    Reduce la ventana a un par mínimo/máximo por columna de píxeles cuando hay
+    más del doble de muestras que píxeles de ancho; el trazo se ve igual pero
+    el rasterizador procesa menos vértices. Las estadísticas usan la ventana completa
+    """
+    bins = int(ax.bbox.width)
+    n = len(y_data)
+    if bins <= 0 or n <= 2 * bins:
+        return x_data, y_data
+    
+    per_bin = n // bins
+    head = n - bins * per_bin  # Muestras más antiguas que no completan un grupo
+    grouped = y_data[head:].reshape(bins, per_bin)
+    i_min = grouped.argmin(axis=1)
+    i_max = grouped.argmax(axis=1)
+    
+    # Mínimo y máximo de cada grupo en orden temporal
+    base = head + np.arange(bins) * per_bin
+    idx = np.empty(2 * bins + 1, dtype=np.intp)
+    idx[0:-1:2] = base + np.minimum(i_min, i_max)
+    idx[1:-1:2] = base + np.maximum(i_min, i_max)
+    idx[-1] = n - 1  # La última muestra siempre se dibuja
+    if head:
+        # El resto inicial se resume como un grupo más
+        first = y_data[:head]
+        lo, hi = sorted((int(first.argmin()), int(first.argmax())))
+        idx = np.concatenate(((lo, hi), idx))
+    return x_data[idx], y_data[idx]
+
 def init():
     """Inicializa el gráfico"""
     line.set_data([], [])
-    return line,
+    return line, info_text
+
+# Estadísticas de la última ventana dibujada: (clave, (min, max, promedio))
+_window_stats_cache = [None, None]
+
+def window_stats(y_data):
+    """Min, max y promedio de la ventana; solo se recalculan si llegaron muestras"""
+    key = (monitor.sample_count, len(y_data))
+    if _window_stats_cache[0] != key:
+        _window_stats_cache[0] = key
+        # Reducciones de NumPy en C sobre la vista float32; el promedio acumula
+        # en float64 para no perder precisión en ventanas largas (WINDOW_SIZE=0)
+        _window_stats_cache[1] = (float(y_data.min()), float(y_data.max()),
+                                  float(y_data.mean(dtype=np.float64)))
+    return _window_stats_cache[1]
+
+# Reescalado perezoso: cada cambio de límites obliga a redibujar la figura
+# completa, así que solo se cambian cuando los datos salen de la vista (o la
+# vista queda demasiado holgada). El texto informativo se refresca a 2 Hz
+X_LOOKAHEAD = 0.10      # Espacio libre a la derecha al reescalar X (fracción del rango)
+Y_SHRINK_RATIO = 2.0    # Se ajusta Y si la vista es más del doble de lo necesario
+INFO_INTERVAL = 0.5     # Segundos entre actualizaciones del texto informativo
+_last_info_time = [0.0]
 
 def animate(frame):
     """Actualiza el gráfico con auto-escalado inteligente"""
     monitor.read_data()
     
+    # Límites antes del cuadro: si cambian hay que redibujar ejes y marcas
+    prev_view = (ax.get_xlim(), ax.get_ylim())
+    
     if len(monitor.force_data) > 0:
-        total_samples = len(monitor.force_data)
+        stored = len(monitor.force_data)
+        # Con ENABLE_MAX_SAMPLES el eje X recorre el buffer; si no, el anillo
+        # solo guarda la ventana y el eje X sigue el total de muestras recibidas
+        total_samples = stored if ENABLE_MAX_SAMPLES else monitor.force_data.total
         
         # ============ VENTANA DESLIZANTE ============
         if WINDOW_SIZE > 0 and total_samples > WINDOW_SIZE:
             # Mostrar solo las últimas WINDOW_SIZE muestras
             start_idx = total_samples - WINDOW_SIZE
-            y_data = list(monitor.force_data)[start_idx:]
-            x_data = list(range(start_idx + 1, total_samples + 1))
         else:
             # Mostrar todas las muestras
-            y_data = list(monitor.force_data)
-            x_data = list(range(1, total_samples + 1))
+            start_idx = 0
+        
+        # Vista directa sobre el buffer de muestras (sin copia)
+        y_data = monitor.force_data.window(stored - (total_samples - start_idx))
+        x_data = sample_index(start_idx, total_samples)
         
-        line.set_data(x_data, y_data)
+        line.set_data(*display_data(x_data, y_data))
         
         # ============ AUTO-ESCALADO HORIZONTAL (X) ============
-        if x_data:
-            x_min = min(x_data)
-            x_max = max(x_data)
+        # x_data es creciente: los extremos son el primer y último elemento
+        if len(x_data):
+            x_min = x_data[0]
+            x_max = x_data[-1]
             x_range = x_max - x_min
             
+            cur_x0, cur_x1 = ax.get_xlim()
+            
             if x_range == 0:
                 # Solo una muestra
-                ax.set_xlim(x_min - 5, x_min + 5)
-            else:
-                # Margen horizontal del 5%
+                if not (cur_x0 <= x_min <= cur_x1):
+                    ax.set_xlim(x_min - 5, x_min + 5)
+            elif x_min < cur_x0 or x_max > cur_x1:
+                # Margen horizontal del 5% y holgura a la derecha para que los
+                # siguientes cuadros no cambien los límites
                 x_margin = max(5, x_range * 0.05)
-                ax.set_xlim(x_min - x_margin, x_max + x_margin)
+                ax.set_xlim(x_min - x_margin, x_max + x_margin + x_range * X_LOOKAHEAD)
         
         # ============ AUTO-ESCALADO VERTICAL (Y) ============
-        if y_data:
-            y_min = min(y_data)
-            y_max = max(y_data)
+        if len(y_data):
+            y_min, y_max, y_avg = window_stats(y_data)
             y_range = y_max - y_min
             
             if y_range == 0:
                 # Todos los valores iguales
                 center = y_max
                 margin = max(50, center * 0.2)  # 20% del valor o mínimo 50
-                ax.set_ylim(max(0, center - margin), center + margin)
+                new_y_min, new_y_max = max(0, center - margin), center + margin
             else:
                 # Margen vertical del 20%
                 margin_percent = 0.20
@@ -339,41 +701,51 @@ def animate(frame):
                 
                 # No permitir valores negativos
                 new_y_min = max(0, new_y_min)
-                
+            
+            cur_y0, cur_y1 = ax.get_ylim()
+            if (y_min < cur_y0 or y_max > cur_y1
+                    or cur_y1 - cur_y0 > Y_SHRINK_RATIO * (new_y_max - new_y_min)):
                 ax.set_ylim(new_y_min, new_y_max)
         
         # ============ LÍNEA DE REFERENCIA TARGET ============
-        # Limpiar líneas horizontales anteriores (excepto la de datos)
-        for artist in ax.lines[1:]:
-            artist.remove()
-        
-        # Solo agregar línea de target si está dentro del rango visible
+        # Solo mostrar la línea de target si está dentro del rango visible
         current_ylim = ax.get_ylim()
-        if current_ylim[0] <= TARGET_FORCE <= current_ylim[1]:
-            ax.axhline(y=TARGET_FORCE, color='red', linestyle='--', alpha=0.8, 
-                      linewidth=2, label=f'Target: {TARGET_FORCE} gF')
+        # set_visible marca la figura como modificada aunque el valor no
+        # cambie; solo se llama cuando la visibilidad realmente cambia
+        visible = current_ylim[0] <= TARGET_FORCE <= current_ylim[1]
+        if target_line.get_visible() != visible:
+            target_line.set_visible(visible)
         
         # ============ INFORMACIÓN DINÁMICA ============
-        if monitor.sample_count > 0:
-            current_force = y_data[-1] if y_data else 0
-            window_min = min(y_data) if y_data else 0
-            window_max = max(y_data) if y_data else 0
-            window_avg = sum(y_data) / len(y_data) if y_data else 0
+        now = time.monotonic()
+        if monitor.sample_count > 0 and now - _last_info_time[0] >= INFO_INTERVAL:
+            _last_info_time[0] = now
+            current_force = y_data[-1] if len(y_data) else 0
+            window_min = y_min if len(y_data) else 0
+            window_max = y_max if len(y_data) else 0
+            window_avg = y_avg if len(y_data) else 0
             
             # Determinar si estamos en ventana deslizante
             window_info = f"(Ventana: últimas {len(y_data)} muestras)" if WINDOW_SIZE > 0 and total_samples > WINDOW_SIZE else ""
             
-            title = f'🎯 ESP32 Gripper Force Monitor | Total: {monitor.sample_count} muestras {window_info}\n'
-            title += f'📊 Actual: {current_force:.1f} gF | Min: {window_min:.1f} | Max: {window_max:.1f} | Promedio: {window_avg:.1f} gF'
+            info = f'Total: {monitor.sample_count} muestras {window_info}\n'
+            info += f'Actual: {current_force:.1f} gF | Min: {window_min:.1f} | Max: {window_max:.1f} | Promedio: {window_avg:.1f} gF'
             
-            ax.set_title(title, fontsize=10, pad=20)
+            info_text.set_text(info)
     else:
         # ============ ESTADO INICIAL ============
-        ax.set_title(f'⏳ Esperando datos del ESP32... (Puerto: {SERIAL_PORT})', fontsize=12)
+        info_text.set_text(f'⏳ Esperando datos del ESP32... (Puerto: {SERIAL_PORT})')
         ax.set_xlim(0, 50)
         ax.set_ylim(0, TARGET_FORCE * 2)
     
-    return line,
+    # Con blit el fondo (ejes, marcas, rejilla) se reutiliza entre cuadros;
+    # si cambiaron los límites se redibuja la figura completa antes de que
+    # FuncAnimation capture el nuevo fondo
+    if (ax.get_xlim(), ax.get_ylim()) != prev_view:
+        fig.canvas.draw()
+    
+    # Artistas que cambian en cada cuadro (los únicos que repinta el blit)
+    return line, info_text
 
 def main():
     """Función principal"""
@@ -407,7 +779,7 @@ def main():
     # Enviar comando de fuerza objetivo
     print("🎯 Configurando fuerza objetivo...")
     time.sleep(0.5)
-    monitor.send_command(f"MOVE GRIP TFORCE {TARGET_FORCE}")
+    monitor.send_raw(monitor._cmd_tforce)
     
     # Iniciar animación
     ani = animation.FuncAnimation(
@@ -415,7 +787,7 @@ def main():
         animate, 
         init_func=init,
         interval=50,   # Actualizar cada 50ms para mejor fluidez
-        blit=False,    # Desactivar blit para permitir auto-escalado
+        blit=True,     # Solo se repintan la línea y el texto informativo
         cache_frame_data=False,
         repeat=True
     )
@@ -432,7 +804,7 @@ def main():
     finally:
         print("\n🏠 Enviando gripper a posición HOME...")
         try:
-            monitor.send_command("MOVE GRIP HOME")
+            monitor.send_raw(monitor._cmd_home)
             time.sleep(1)  # Esperar a que se ejecute el comando
         except Exception as e:
             print(f"⚠️ Error al enviar comando HOME: {e}")
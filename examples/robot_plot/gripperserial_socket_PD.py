@@ -5,6 +5,7 @@ TARGET_FORCE = 400             # Fuerza objetivo en gF
 MAX_SAMPLES = 5000             # Máximo de muestras a graficar
 ENABLE_MAX_SAMPLES = False     # True: limitar muestras, False: sin límite
 WINDOW_SIZE = 1000             # Tamaño de ventana deslizante para visualización (0 = mostrar todo)
+SEND_QUEUE_SIZE = 32           # Comandos pendientes antes de que send_command espere al envío
 
 # ============== CONFIGURACIÓN PID GAINS ================
 PID_KP = 1.0        # Ganancia proporcional
@@ -16,11 +17,15 @@ Script para monitorear y graficar datos de fuerza del ESP32 via Socket
 """
 
 import socket
+import selectors
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from matplotlib.widgets import Slider, Button
+import numpy as np
 import re
 import time
+import os
+import logging
 import threading
 import queue
 from collections import deque
@@ -28,6 +33,15 @@ from datetime import datetime
 
 # =======================================================
 
+# Registro de depuración del lazo de recepción; nivel por variable de entorno
+# (p. ej. GRIP_LOG=DEBUG). Por defecto WARNING: no se imprime nada por línea
+log = logging.getLogger('grip')
+log.setLevel(os.environ.get('GRIP_LOG', 'WARNING').upper())
+if not log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(_handler)
+
 def validate_pid_gains():
     """Valida que las ganancias PID sean valores positivos"""
     global PID_KP, PID_KI, PID_KD
@@ -39,6 +53,106 @@ def validate_pid_gains():
         PID_KD = max(0, PID_KD)
         print(f"📝 Ganancias corregidas - KP: {PID_KP}, KI: {PID_KI}, KD: {PID_KD}")
 
+# Patrones de fuerza compilados una sola vez, en orden de prioridad
+_FORCE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'#(\d+(?:\.\d+)?)\*',             # Patrón #numero* (formato ESP32)
+    r'Grip force:\s*(\d+(?:\.\d+)?)',  # Patrón original
+    r'Force:\s*(\d+(?:\.\d+)?)',       # Patrón alternativo 1
+    r'force:\s*(\d+(?:\.\d+)?)',       # Patrón alternativo 2 (minúscula)
+    r'(\d+(?:\.\d+)?)\s*gF',           # Patrón con unidad gF
+    r'(\d+(?:\.\d+)?)\s*g',            # Patrón con unidad g
+    r'F:\s*(\d+(?:\.\d+)?)',           # Patrón corto
+    r'^(\d+(?:\.\d+)?)$',              # Número simple
+))
+
+# Unión de todos los patrones en una sola pasada. Si no hay coincidencia
+# ningún patrón coincide; si coincide "#numero*" (máxima prioridad) ya es el
+# resultado. Otra alternativa puede aparecer antes en la línea que un patrón
+# de más prioridad, así que en ese caso se recorre la lista en orden
+_FORCE_RE = re.compile(
+    r'#(?P<hash>\d+(?:\.\d+)?)\*'
+    r'|Grip force:\s*(?P<grip>\d+(?:\.\d+)?)'
+    r'|Force:\s*(?P<force>\d+(?:\.\d+)?)'
+    r'|(?P<gf>\d+(?:\.\d+)?)\s*gF'
+    r'|(?P<g>\d+(?:\.\d+)?)\s*g'
+    r'|F:\s*(?P<f>\d+(?:\.\d+)?)'
+    r'|^(?P<bare>\d+(?:\.\d+)?)$',
+    re.IGNORECASE
+)
+
+# Comandos ya codificados con su salto de línea. El conjunto es pequeño
+# (HOME, TFORCE, GAINS...), pero los sliders pueden generar variantes de
+# GAINS, así que se vacía al llegar al tope
+_ENC_CACHE = {}
+_ENC_CACHE_MAX = 64
+
+class ForceBuffer:
+    """
+    Muestras de fuerza en un arreglo float32 contiguo.
+    Con maxlen funciona como anillo espejado (cada valor se escribe en i e
+    i+maxlen), así las últimas maxlen muestras siempre son un slice sin copia.
+    Sin maxlen crece duplicando su capacidad. total cuenta todas las muestras
+    agregadas, incluidas las que el anillo ya descartó.
+    """
+    def __init__(self, maxlen=None, capacity=MAX_SAMPLES):
+        self.maxlen = maxlen
+        size = 2 * maxlen if maxlen else capacity
+        self.buf = np.zeros(size, dtype=np.float32)
+        self.head = 0  # Próxima posición de escritura
+        self.n = 0     # Muestras válidas
+        self.total = 0 # Muestras agregadas desde el inicio
+    
+    def append(self, value):
+        self.total += 1
+        if self.maxlen:
+            self.buf[self.head] = value
+            self.buf[self.head + self.maxlen] = value
+            self.head = (self.head + 1) % self.maxlen
+            self.n = min(self.n + 1, self.maxlen)
+        else:
+            if self.n == len(self.buf):
+                self.buf = np.concatenate((self.buf, np.zeros_like(self.buf)))
+            self.buf[self.n] = value
+            self.n += 1
+    
+    def extend(self, values):
+        """Agrega un lote de muestras con escrituras vectorizadas"""
+        arr = np.asarray(values, dtype=np.float32)
+        k = len(arr)
+        self.total += k
+        if self.maxlen:
+            if k >= self.maxlen:
+                arr = arr[-self.maxlen:]
+                self.buf[:self.maxlen] = arr
+                self.buf[self.maxlen:] = arr
+                self.head = 0
+                self.n = self.maxlen
+                return
+            idx = (self.head + np.arange(k)) % self.maxlen
+            self.buf[idx] = arr
+            self.buf[idx + self.maxlen] = arr
+            self.head = (self.head + k) % self.maxlen
+            self.n = min(self.n + k, self.maxlen)
+        else:
+            while self.n + k > len(self.buf):
+                self.buf = np.concatenate((self.buf, np.zeros_like(self.buf)))
+            self.buf[self.n:self.n + k] = arr
+            self.n += k
+    
+    def clear(self):
+        self.head = 0
+        self.n = 0
+        self.total = 0
+    
+    def __len__(self):
+        return self.n
+    
+    def window(self, start=0):
+        """Devuelve las muestras desde start (en orden cronológico) sin copiar"""
+        if self.maxlen and self.n == self.maxlen:
+            return self.buf[self.head + start:self.head + self.maxlen]
+        return self.buf[start:self.n]
+
 class ESP32GripSocketMonitor:
     def __init__(self):
         self.socket = None
@@ -46,45 +160,70 @@ class ESP32GripSocketMonitor:
         self.running = False
         
         # Datos para gráfico
-        self.force_data = deque(maxlen=MAX_SAMPLES if ENABLE_MAX_SAMPLES else None)
+        # Sin límite de muestras solo se grafica la ventana deslizante: el anillo
+        # preasignado guarda WINDOW_SIZE muestras en vez de crecer sin fin
+        if ENABLE_MAX_SAMPLES:
+            maxlen = MAX_SAMPLES
+        else:
+            maxlen = WINDOW_SIZE if WINDOW_SIZE > 0 else None
+        self.force_data = ForceBuffer(maxlen=maxlen)
         self.sample_count = 0
         self.finished = False
         
         # Threading para comunicación no bloqueante
-        self.send_queue = queue.Queue()
-        self.receive_queue = queue.Queue()
+        # Cola acotada: send_command solo espera si el hilo de envío va atrasado
+        self.send_queue = queue.Queue(maxsize=SEND_QUEUE_SIZE)
+        # Recepción: un solo productor y un solo consumidor; append/popleft de
+        # deque son atómicos en CPython y evitan el Lock + Condition de Queue
+        self.receive_queue = deque()
         self.receiver_thread = None
         self.sender_thread = None
         
-        # Buffer para datos sin procesar
-        self.data_buffer = ""
+        # Par de sockets para despertar al hilo de recepción al detener
+        self._wake_r = None
+        self._wake_w = None
+        
+        # Bytes recibidos aún sin línea completa: solo se decodifican líneas
+        # completas, así no se cortan caracteres UTF-8 repartidos entre recv()
+        self.data_buffer = bytearray()
         
     def connect(self):
         """Conecta al dispositivo via socket"""
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Buffer de recepción amplio (antes de conectar, para que se anuncie
+            # una ventana TCP grande); absorbe ráfagas mientras la GUI dibuja
+            try:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 262144)
+            except OSError:
+                pass
             self.socket.settimeout(5.0)  # Timeout inicial para conexión
             self.socket.connect((SOCKET_HOST, SOCKET_PORT))
             self.connected = True
             print(f"✓ Conectado a {SOCKET_HOST}:{SOCKET_PORT}")
             
+            # Comandos cortos: sin Nagle, salen sin esperar al ACK anterior
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            
             # Configurar socket para operación no bloqueante
             self.socket.settimeout(0.1)
             
             # Leer mensaje de bienvenida
-            welcome_data = ""
+            welcome_data = bytearray()
             start_time = time.time()
             
             try:
                 while time.time() - start_time < 2:
-                    data = self.socket.recv(1024).decode('utf-8', errors='ignore')
+                    data = self.socket.recv(1024)
                     if data:
-                        welcome_data += data
+                        welcome_data.extend(data)
                     else:
                         break
             except socket.timeout:
                 pass
             
+            # Decodificar una sola vez todo lo recibido
+            welcome_data = welcome_data.decode('utf-8', errors='ignore')
             if welcome_data:
                 print("📄 Dispositivo conectado:")
                 print(welcome_data.strip()[:200])  # Mostrar primeras líneas
@@ -102,6 +241,9 @@ class ESP32GripSocketMonitor:
             
         self.running = True
         
+        # socketpair (y no os.pipe) para que el selector funcione también en Windows
+        self._wake_r, self._wake_w = socket.socketpair()
+        
         # Hilo de recepción
         self.receiver_thread = threading.Thread(target=self._receiver_worker, daemon=True)
         self.receiver_thread.start()
@@ -115,30 +257,60 @@ class ESP32GripSocketMonitor:
     
     def _receiver_worker(self):
         """Hilo que recibe datos continuamente"""
+        buffer = self.data_buffer
+        chunk = bytearray(65536)  # Una sola llamada vacía lo acumulado en ráfagas
+        view = memoryview(chunk)
+        
+        # Bloquear en el selector hasta que lleguen datos o stop() escriba en
+        # el socket de aviso; sin timeouts, el hilo no despierta si no hay tráfico.
+        # El socket sigue en modo bloqueante porque el hilo de envío usa sendall
+        self.socket.settimeout(None)
+        sel = selectors.DefaultSelector()
+        sel.register(self.socket, selectors.EVENT_READ)
+        sel.register(self._wake_r, selectors.EVENT_READ)
+        
         while self.running and self.connected:
             try:
-                data = self.socket.recv(2048).decode('utf-8', errors='ignore')
-                if not data:
+                events = sel.select()
+                if any(key.fileobj is self._wake_r for key, _ in events):
+                    break
+                
+                n = self.socket.recv_into(view)
+                if n == 0:
                     print("⚠️ Conexión cerrada por el dispositivo")
                     self.connected = False
                     break
                 
-                self.data_buffer += data
+                # La búsqueda del salto de línea empieza en los bytes nuevos:
+                # la línea parcial previa ya se revisó
+                scan_from = len(buffer)
+                buffer += view[:n]
                 
-                # Procesar líneas completas
-                while '\n' in self.data_buffer:
-                    line, self.data_buffer = self.data_buffer.split('\n', 1)
-                    line = line.strip()
+                # Último salto de línea (como rpartition): lo que sigue es la
+                # línea parcial y se conserva para la próxima lectura
+                last = buffer.rfind(b'\n', scan_from)
+                if last < 0:
+                    continue
+                
+                # Procesar líneas completas recorriendo por índice y recortar
+                # el buffer una sola vez, en lugar de desplazarlo por cada línea
+                start = 0
+                while start <= last:
+                    idx = buffer.find(b'\n', start, last + 1)
+                    line = buffer[start:idx].decode('utf-8', errors='ignore').strip()
+                    start = idx + 1
                     if line:
                         # Poner en cola para procesamiento
-                        self.receive_queue.put(line)
+                        self.receive_queue.append(line)
+                del buffer[:last + 1]
                         
-            except socket.timeout:
-                continue
             except Exception as e:
                 if self.running:
                     print(f"❌ Error en recepción: {e}")
                 break
+        
+        view.release()
+        sel.close()
     
     def _sender_worker(self):
         """Hilo que envía comandos desde la cola"""
@@ -149,7 +321,12 @@ class ESP32GripSocketMonitor:
                 if command == "STOP_THREAD":
                     break
                     
-                self.socket.sendall((command + "\n").encode())
+                enc = _ENC_CACHE.get(command)
+                if enc is None:
+                    if len(_ENC_CACHE) >= _ENC_CACHE_MAX:
+                        _ENC_CACHE.clear()
+                    enc = _ENC_CACHE[command] = (command + "\n").encode()
+                self.socket.sendall(enc)
                 timestamp = datetime.now().strftime("%H:%M:%S")
                 print(f"📤 [{timestamp}] Comando enviado: {command}")
                 
@@ -165,26 +342,33 @@ class ESP32GripSocketMonitor:
     def send_command(self, command):
         """Envía comando de forma no bloqueante"""
         if self.running and self.connected:
-            self.send_queue.put(command)
-            time.sleep(0.1)  # Pequeña pausa para procesamiento
+            try:
+                self.send_queue.put(command, timeout=1.0)
+            except queue.Full:
+                print(f"❌ Error: Cola de envío llena, comando descartado: {command}")
         else:
             print(f"❌ Error: Socket no disponible para enviar comando: {command}")
     
     def parse_force(self, line):
         """Parsea la línea para extraer el valor de fuerza"""
-        patterns = [
-            r'#(\d+(?:\.\d+)?)\*',             # Patrón #numero* (formato ESP32)
-            r'Grip force:\s*(\d+(?:\.\d+)?)',  # Patrón original
-            r'Force:\s*(\d+(?:\.\d+)?)',       # Patrón alternativo 1
-            r'force:\s*(\d+(?:\.\d+)?)',       # Patrón alternativo 2 (minúscula)
-            r'(\d+(?:\.\d+)?)\s*gF',           # Patrón con unidad gF
-            r'(\d+(?:\.\d+)?)\s*g',            # Patrón con unidad g
-            r'F:\s*(\d+(?:\.\d+)?)',           # Patrón corto
-            r'^(\d+(?:\.\d+)?)$',              # Número simple
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, line.strip(), re.IGNORECASE)
+        line = line.strip()
+        
+        # Camino rápido: el formato habitual del ESP32 es la línea "#numero*";
+        # se convierte sin regex. La validación (dígitos y a lo sumo un punto
+        # interior) acepta lo mismo que el patrón; otra forma sigue al general
+        if line[:1] == '#' and line[-1:] == '*':
+            value = line[1:-1]
+            if value[:1].isdecimal() and value[-1:].isdecimal() and value.replace('.', '', 1).isdecimal():
+                return float(value)
+        
+        match = _FORCE_RE.search(line)
+        if match is None:
+            return None
+        if match.lastgroup == 'hash':
+            return float(match.group('hash'))
+        
+        for pattern in _FORCE_PATTERNS:
+            match = pattern.search(line)
             if match:
                 force_value = float(match.group(1))
                 # Ya viene en gF, no necesita conversión para el patrón #numero*
@@ -192,43 +376,50 @@ class ESP32GripSocketMonitor:
         return None
     
     def read_data(self):
-        """Lee y procesa datos de la cola de recepción"""
-        new_data_count = 0
-        
+        """Lee y procesa datos de la cola de recepción (todo lo pendiente en un lote)"""
+        # Vaciar la cola primero y procesar después, sin alternar con el receptor
+        lines = []
+        pop = self.receive_queue.popleft
         try:
             while True:
-                line = self.receive_queue.get_nowait()
+                lines.append(pop())
+        except IndexError:
+            pass  # Cola vacía
+        
+        batch = []  # Fuerzas del cuadro; se escriben al buffer de una vez
+        debug = log.isEnabledFor(logging.DEBUG)
+        info = log.isEnabledFor(logging.INFO)
+        
+        for line in lines:
+            if not line:
+                continue
+            
+            # Debug: mostrar línea recibida ocasionalmente
+            if debug and (self.sample_count + len(batch)) % 10 == 0:
+                log.debug("📥 Línea recibida: %s", line)
+            
+            force = self.parse_force(line)
+            if force is not None:
+                batch.append(force)
                 
-                if line:
-                    # Debug: mostrar línea recibida ocasionalmente
-                    if self.sample_count % 10 == 0:  # Cada 10 muestras para ver más frecuente
-                        print(f"📥 Línea recibida: {line}")
-                    
-                    force = self.parse_force(line)
-                    if force is not None:
-                        self.force_data.append(force)
-                        self.sample_count += 1
-                        new_data_count += 1
-                        
-                        # Mostrar progreso cada 25 muestras
-                        if self.sample_count % 25 == 0:
-                            print(f"✅ Muestra {self.sample_count}: {force:.1f} gF (de línea: {line})")
-                        
-                        # Verificar si alcanzamos el máximo
-                        if ENABLE_MAX_SAMPLES and self.sample_count >= MAX_SAMPLES:
-                            if not self.finished:
-                                print(f"\n✓ Alcanzadas {MAX_SAMPLES} muestras")
-                                self.send_command("MOVE GRIP HOME")
-                                self.finished = True
-                    else:
-                        # Debug: mostrar líneas no parseadas más frecuentemente
-                        if self.sample_count % 20 == 0:
-                            print(f"⚠️ No parseado: '{line}'")
+                # Mostrar progreso cada 25 muestras
+                if info and (self.sample_count + len(batch)) % 25 == 0:
+                    log.info("✅ Muestra %d: %.1f gF (de línea: %s)", self.sample_count + len(batch), force, line)
+            elif debug and (self.sample_count + len(batch)) % 20 == 0:
+                # Debug: mostrar líneas no parseadas ocasionalmente
+                log.debug("⚠️ No parseado: '%s'", line)
         
-        except queue.Empty:
-            pass
+        if batch:
+            self.force_data.extend(batch)
+            self.sample_count += len(batch)
         
-        return new_data_count > 0
+        # Verificar si alcanzamos el máximo (una vez por cuadro, no por muestra)
+        if ENABLE_MAX_SAMPLES and not self.finished and self.sample_count >= MAX_SAMPLES:
+            print(f"\n✓ Alcanzadas {MAX_SAMPLES} muestras")
+            self.send_command("MOVE GRIP HOME")
+            self.finished = True
+        
+        return len(batch) > 0
     
     def stop(self):
         """Detiene los hilos y cierra la conexión"""
@@ -237,10 +428,18 @@ class ESP32GripSocketMonitor:
         
         # Señal de parada al hilo de envío
         try:
-            self.send_queue.put("STOP_THREAD")
-        except:
+            # Sin bloquear: con la cola llena el hilo sale igual al ver running=False
+            self.send_queue.put_nowait("STOP_THREAD")
+        except queue.Full:
             pass
         
+        # Despertar al hilo de recepción bloqueado en el selector
+        if self._wake_w:
+            try:
+                self._wake_w.send(b'\0')
+            except OSError:
+                pass
+        
         # Esperar hilos
         if self.sender_thread and self.sender_thread.is_alive():
             self.sender_thread.join(timeout=2)
@@ -248,6 +447,10 @@ class ESP32GripSocketMonitor:
         if self.receiver_thread and self.receiver_thread.is_alive():
             self.receiver_thread.join(timeout=2)
         
+        for wake in (self._wake_r, self._wake_w):
+            if wake:
+                wake.close()
+        
         # Cerrar socket
         if self.socket:
             try:
@@ -285,6 +488,15 @@ ax.set_autoscaley_on(True)
 ax.set_xlim(0, 50)
 ax.set_ylim(0, TARGET_FORCE * 2)
 
+# Línea de referencia creada una sola vez; en cada cuadro solo se muestra u oculta
+target_line = ax.axhline(y=TARGET_FORCE, color='red', linestyle='--', alpha=0.8,
+                         linewidth=2, label=f'Target: {TARGET_FORCE} gF', visible=False)
+
+# Texto dinámico dentro de los ejes: con blit solo se repinta el área de los
+# ejes, así que la información por cuadro no puede ir en el título
+info_text = ax.text(0.01, 0.98, '', transform=ax.transAxes, va='top', ha='left', fontsize=10,
+                    bbox=dict(facecolor='white', alpha=0.8, edgecolor='none'))
+
 # ============== CONTROLES PID ================
 # Sliders para PID
 ax_kp = fig.add_subplot(gs[1, :])
@@ -360,54 +572,93 @@ btn_tforce.on_clicked(start_tforce)
 btn_home.on_clicked(send_home)
 btn_reset.on_clicked(reset_data)
 
+# Eje X precalculado (números de muestra 1..MAX_SAMPLES)
+x_index = np.arange(1, MAX_SAMPLES + 1, dtype=np.int32)
+
+def sample_index(start, stop):
+    """Devuelve los números de muestra start+1..stop (vista si caben en x_index)"""
+    if stop <= len(x_index):
+        return x_index[start:stop]
+    # Más allá del rango precalculado solo se genera la ventana pedida
+    return np.arange(start + 1, stop + 1, dtype=np.int32)
+
 def init():
     """Inicializa el gráfico"""
     line.set_data([], [])
-    return line,
+    return line, target_line, info_text
+
+# Reescalado perezoso: cada cambio de límites obliga a redibujar la figura
+# completa, así que solo se cambian cuando los datos salen de la vista (o la
+# vista queda demasiado holgada)
+X_LOOKAHEAD = 0.10      # Espacio libre a la derecha al reescalar X (fracción del rango)
+Y_SHRINK_RATIO = 2.0    # Se ajusta Y si la vista es más del doble de lo necesario
+
+# Estado mostrado en el último cuadro: si no cambió no hay nada que recalcular
+_last_state = [None]
 
 def animate(frame):
     """Actualiza el gráfico con auto-escalado inteligente"""
     # Leer nuevos datos
     monitor.read_data()
     
+    # Sin muestras nuevas, sin cambio de conexión ni de sliders: el cuadro es
+    # idéntico al anterior (el blit repinta los mismos artistas)
+    state = (monitor.force_data.total, len(monitor.force_data), monitor.connected,
+             current_kp, current_ki, current_kd)
+    if state == _last_state[0]:
+        return line, target_line, info_text
+    _last_state[0] = state
+    
+    # Límites antes del cuadro: si cambian hay que redibujar ejes y marcas
+    prev_view = (ax.get_xlim(), ax.get_ylim())
+    
     if len(monitor.force_data) > 0:
-        total_samples = len(monitor.force_data)
+        stored = len(monitor.force_data)
+        # Con ENABLE_MAX_SAMPLES el eje X recorre el buffer; si no, el anillo
+        # solo guarda la ventana y el eje X sigue el total de muestras recibidas
+        total_samples = stored if ENABLE_MAX_SAMPLES else monitor.force_data.total
         
         # ============ VENTANA DESLIZANTE ============
         if WINDOW_SIZE > 0 and total_samples > WINDOW_SIZE:
             # Mostrar solo las últimas WINDOW_SIZE muestras
             start_idx = total_samples - WINDOW_SIZE
-            y_data = list(monitor.force_data)[start_idx:]
-            x_data = list(range(start_idx + 1, total_samples + 1))
         else:
             # Mostrar todas las muestras
-            y_data = list(monitor.force_data)
-            x_data = list(range(1, total_samples + 1))
+            start_idx = 0
+        
+        # Vista directa sobre el buffer de muestras (sin copia)
+        y_data = monitor.force_data.window(stored - (total_samples - start_idx))
+        x_data = sample_index(start_idx, total_samples)
         
         line.set_data(x_data, y_data)
         
         # ============ AUTO-ESCALADO HORIZONTAL (X) ============
-        if x_data:
-            x_min = min(x_data)
-            x_max = max(x_data)
+        if len(x_data):
+            x_min = x_data[0]
+            x_max = x_data[-1]
             x_range = x_max - x_min
             
+            cur_x0, cur_x1 = ax.get_xlim()
+            
             if x_range == 0:
-                ax.set_xlim(x_min - 5, x_min + 5)
-            else:
+                if not (cur_x0 <= x_min <= cur_x1):
+                    ax.set_xlim(x_min - 5, x_min + 5)
+            elif x_min < cur_x0 or x_max > cur_x1:
+                # Holgura a la derecha para que los siguientes cuadros no
+                # cambien los límites
                 x_margin = max(5, x_range * 0.05)
-                ax.set_xlim(x_min - x_margin, x_max + x_margin)
+                ax.set_xlim(x_min - x_margin, x_max + x_margin + x_range * X_LOOKAHEAD)
         
         # ============ AUTO-ESCALADO VERTICAL (Y) ============
-        if y_data:
-            y_min = min(y_data)
-            y_max = max(y_data)
+        if len(y_data):
+            y_min = y_data.min()
+            y_max = y_data.max()
             y_range = y_max - y_min
             
             if y_range == 0:
                 center = y_max
                 margin = max(50, center * 0.2)
-                ax.set_ylim(max(0, center - margin), center + margin)
+                new_y_min, new_y_max = max(0, center - margin), center + margin
             else:
                 margin_percent = 0.20
                 margin = y_range * margin_percent
@@ -415,45 +666,55 @@ def animate(frame):
                 
                 new_y_min = max(0, y_min - margin)
                 new_y_max = y_max + margin
-                
+            
+            cur_y0, cur_y1 = ax.get_ylim()
+            if (y_min < cur_y0 or y_max > cur_y1
+                    or cur_y1 - cur_y0 > Y_SHRINK_RATIO * (new_y_max - new_y_min)):
                 ax.set_ylim(new_y_min, new_y_max)
         
         # ============ LÍNEA DE REFERENCIA TARGET ============
-        for artist in ax.lines[1:]:
-            artist.remove()
-        
+        # Solo mostrar la línea de target si está dentro del rango visible
         current_ylim = ax.get_ylim()
-        if current_ylim[0] <= TARGET_FORCE <= current_ylim[1]:
-            ax.axhline(y=TARGET_FORCE, color='red', linestyle='--', alpha=0.8, 
-                      linewidth=2, label=f'Target: {TARGET_FORCE} gF')
+        # set_visible marca el artista como modificado aunque el valor no
+        # cambie; solo se llama cuando la visibilidad realmente cambia
+        visible = current_ylim[0] <= TARGET_FORCE <= current_ylim[1]
+        if target_line.get_visible() != visible:
+            target_line.set_visible(visible)
         
         # ============ INFORMACIÓN DINÁMICA ============
         if monitor.sample_count > 0:
-            current_force = y_data[-1] if y_data else 0
-            window_min = min(y_data) if y_data else 0
-            window_max = max(y_data) if y_data else 0
-            window_avg = sum(y_data) / len(y_data) if y_data else 0
+            current_force = y_data[-1] if len(y_data) else 0
+            window_min = y_min if len(y_data) else 0
+            window_max = y_max if len(y_data) else 0
+            window_avg = y_data.mean(dtype=np.float64) if len(y_data) else 0
             
             # Estado de conexión
             connection_status = "🟢 Conectado" if monitor.connected else "🔴 Desconectado"
             
             window_info = f"(Ventana: últimas {len(y_data)} muestras)" if WINDOW_SIZE > 0 and total_samples > WINDOW_SIZE else ""
             
-            title = f'🌐 ESP32 Gripper Socket Monitor | {connection_status} | Total: {monitor.sample_count} muestras {window_info}\n'
-            title += f'📊 Actual: {current_force:.1f} gF | Min: {window_min:.1f} | Max: {window_max:.1f} | Promedio: {window_avg:.1f} gF\n'
-            title += f'🔧 PID: KP={current_kp:.2f} | KI={current_ki:.2f} | KD={current_kd:.2f}'
+            info = f'🌐 {connection_status} | Total: {monitor.sample_count} muestras {window_info}\n'
+            info += f'📊 Actual: {current_force:.1f} gF | Min: {window_min:.1f} | Max: {window_max:.1f} | Promedio: {window_avg:.1f} gF\n'
+            info += f'🔧 PID: KP={current_kp:.2f} | KI={current_ki:.2f} | KD={current_kd:.2f}'
             
-            ax.set_title(title, fontsize=10, pad=20)
+            info_text.set_text(info)
     else:
         # ============ ESTADO INICIAL ============
         connection_status = "🟡 Conectando..." if monitor.connected else "🔴 Sin conexión"
         title_init = f'{connection_status} a {SOCKET_HOST}:{SOCKET_PORT} - Esperando datos...\n'
         title_init += f'🔧 PID: KP={current_kp:.2f} | KI={current_ki:.2f} | KD={current_kd:.2f}'
-        ax.set_title(title_init, fontsize=10)
+        info_text.set_text(title_init)
         ax.set_xlim(0, 50)
         ax.set_ylim(0, TARGET_FORCE * 2)
     
-    return line,
+    # Con blit el fondo (ejes, marcas, rejilla) se reutiliza entre cuadros;
+    # si cambiaron los límites se redibuja la figura completa antes de que
+    # FuncAnimation capture el nuevo fondo
+    if (ax.get_xlim(), ax.get_ylim()) != prev_view:
+        fig.canvas.draw()
+    
+    # Artistas que cambian en cada cuadro (los únicos que repinta el blit)
+    return line, target_line, info_text
 
 def main():
     """Función principal"""
@@ -501,7 +762,7 @@ def main():
         animate, 
         init_func=init,
         interval=100,   # Actualizar cada 100ms para mejor rendimiento con socket
-        blit=False,
+        blit=True,      # Solo se repintan línea, target e información
         cache_frame_data=False,
         repeat=True
     )
@@ -4,17 +4,53 @@ import numpy as np
 import sys
 import json
 import os
+import atexit
+import threading
 from datetime import datetime
 import matplotlib.pyplot as plt
 
+TRAJ_STEPS = 100  # Puntos de la trayectoria articular de cada movimiento
+
+def pose_matrix(x, y, z, rx, ry, rz):
+    """
+    Matriz homogénea 4x4 de Trans(x, y, z) * Rx(rx) * Ry(ry) * Rz(rz) (ángulos
+    en radianes), armada en forma cerrada en lugar de multiplicar cuatro SE3
+    """
+    ca, sa = np.cos(rx), np.sin(rx)
+    cb, sb = np.cos(ry), np.sin(ry)
+    cc, sc = np.cos(rz), np.sin(rz)
+    return np.array([
+        [cb * cc,                 -cb * sc,                 sb,       x],
+        [sa * sb * cc + ca * sc,  -sa * sb * sc + ca * cc,  -sa * cb, y],
+        [-ca * sb * cc + sa * sc,  ca * sb * sc + sa * cc,   ca * cb, z],
+        [0.0,                      0.0,                      0.0,     1.0],
+    ])
+
 class UR5Controller:
-    def __init__(self):
+    def __init__(self, animate=True):
         """Inicializa el controlador del robot UR5"""
         self.robot = rtb.models.UR5()
+        self.animate = animate  # False: mover sin renderizar la trayectoria
         self.current_q = self.robot.qr.copy()  # Posición articular actual
+        # Límites articulares: qlim es (2, n), fila 0 mínimos y fila 1 máximos
+        self.qmin, self.qmax = np.asarray(self.robot.qlim, dtype=float)
+        
+        # Trayectoria preasignada: el perfil quíntico de jtraj (velocidades
+        # inicial y final nulas) solo depende de TRAJ_STEPS, así que se calcula
+        # una vez y cada movimiento escribe q0 + s * (q1 - q0) en el mismo buffer
+        tau = np.linspace(0.0, 1.0, TRAJ_STEPS)
+        self._traj_s = (tau**3 * (10.0 - 15.0 * tau + 6.0 * tau**2))[:, None]
+        self._traj_q = np.empty((TRAJ_STEPS, self.robot.n))
         self.saved_positions_file = "ur5_saved_positions.json"
         self.load_saved_positions()
         
+        # Escritura diferida del archivo de posiciones: save_position solo marca
+        # cambios y un temporizador escribe una vez; al salir se vacía lo pendiente
+        self._positions_dirty = False
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+        atexit.register(self.flush_saved_positions)
+        
     def load_saved_positions(self):
         """Carga posiciones guardadas desde archivo"""
         if os.path.exists(self.saved_positions_file):
@@ -34,10 +70,30 @@ class UR5Controller:
             'joint_config': q_joints.tolist(),
             'timestamp': datetime.now().isoformat()
         }
-        with open(self.saved_positions_file, 'w') as f:
-            json.dump(self.saved_positions, f, indent=2)
+        with self._save_lock:
+            self._positions_dirty = True
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(0.5, self.flush_saved_positions)
+            self._save_timer.daemon = True
+            self._save_timer.start()
         print(f"Posición '{name}' guardada exitosamente")
     
+    def flush_saved_positions(self):
+        """Escribe las posiciones pendientes de forma atómica (archivo temporal + os.replace)"""
+        with self._save_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._positions_dirty:
+                return
+            tmp_file = self.saved_positions_file + ".tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.saved_positions, f, indent=2)
+            # Un archivo a medio escribir nunca reemplaza al anterior
+            os.replace(tmp_file, self.saved_positions_file)
+            self._positions_dirty = False
+    
     def list_saved_positions(self):
         """Lista las posiciones guardadas"""
         if not self.saved_positions:
@@ -86,12 +142,11 @@ class UR5Controller:
     
     def validate_joint_limits(self, q_target):
         """Valida que la configuración esté dentro de los límites articulares"""
-        exceeded_joints = []
-        for i, (q, qmin, qmax) in enumerate(zip(q_target, self.robot.qlim[:, 0], self.robot.qlim[:, 1])):
-            if q < qmin or q > qmax:
-                exceeded_joints.append(i+1)
+        q_target = np.asarray(q_target)
+        exceeded = np.flatnonzero((q_target < self.qmin) | (q_target > self.qmax))
         
-        if exceeded_joints:
+        if exceeded.size:
+            exceeded_joints = (exceeded + 1).tolist()
             print(f"⚠️  ADVERTENCIA: Las articulaciones {exceeded_joints} exceden los límites")
             return False
         return True
@@ -162,6 +217,12 @@ class UR5Controller:
             print("Ejemplo: 0.5 -0.2 0.3 0 0 0")
             return 'continue', None
     
+    def joint_trajectory(self, q_target):
+        """Trayectoria suave (equivalente a rtb.jtraj) en el buffer preasignado"""
+        np.multiply(self._traj_s, np.subtract(q_target, self.current_q), out=self._traj_q)
+        self._traj_q += self.current_q
+        return self._traj_q
+    
     def move_robot_to_position(self, x, y, z, rx, ry, rz):
         """Mueve el robot a la posición especificada"""
         
@@ -175,8 +236,9 @@ class UR5Controller:
         ry_rad = np.radians(ry)
         rz_rad = np.radians(rz)
         
-        # Crear la matriz de transformación objetivo
-        Tep = SE3.Trans(x, y, z) * SE3.Rx(rx_rad) * SE3.Ry(ry_rad) * SE3.Rz(rz_rad)
+        # Crear la matriz de transformación objetivo (ya es una rotación válida,
+        # no hace falta que SE3 la verifique)
+        Tep = SE3(pose_matrix(x, y, z, rx_rad, ry_rad, rz_rad), check=False)
         
         try:
             # Resolver cinemática inversa
@@ -190,14 +252,14 @@ class UR5Controller:
                 
                 print(f"✅ Solución encontrada")
                 
-                # Crear trayectoria suave desde posición actual hasta objetivo
-                qt = rtb.jtraj(self.current_q, q_target, 100)
-                
-                # Visualizar con matplotlib
-                print("� Mostrando visualización con matplotlib...")
-                self.robot.plot(qt.q, backend='pyplot', block=False)
-                plt.show(block=False)
-                plt.pause(0.1)  # Pausa para que se actualice la visualización
+                # Crear y visualizar la trayectoria suave con matplotlib solo si
+                # se pidió animación; si no, basta con actualizar el estado
+                if self.animate:
+                    traj = self.joint_trajectory(q_target)
+                    print("� Mostrando visualización con matplotlib...")
+                    self.robot.plot(traj, backend='pyplot', block=False)
+                    plt.show(block=False)
+                    plt.pause(0.1)  # Pausa para que se actualice la visualización
                 
                 # Actualizar posición actual
                 self.current_q = q_target.copy()
@@ -228,6 +290,7 @@ class UR5Controller:
                 
                 if action == 'quit':
                     print("👋 Cerrando aplicación...")
+                    self.flush_saved_positions()
                     plt.close('all')  # Cerrar todas las ventanas de matplotlib
                     break
                 elif action == 'continue':
@@ -247,18 +310,23 @@ def main():
     """Función principal"""
     print("🤖 Iniciando Control del Robot UR5")
     
+    # --animate: mostrar también la trayectoria del movimiento por argumentos
+    args = [arg for arg in sys.argv[1:] if arg != '--animate']
+    animate = len(args) != len(sys.argv) - 1
+    
     # Verificar si se pasaron argumentos de línea de comandos
-    if len(sys.argv) == 7:
+    if len(args) == 6:
         try:
-            coords = [float(arg) for arg in sys.argv[1:]]
-            controller = UR5Controller()
+            coords = [float(arg) for arg in args]
+            controller = UR5Controller(animate=animate)
             x, y, z, rx, ry, rz = coords
             success = controller.move_robot_to_position(x, y, z, rx, ry, rz)
             if success:
+                controller.animate = True  # El modo interactivo siempre visualiza
                 controller.run_interactive_mode()
         except ValueError:
             print("❌ Error: Argumentos inválidos")
-            print("Uso: python ur5_controller.py x y z rx ry rz")
+            print("Uso: python ur5_controller.py x y z rx ry rz [--animate]")
     else:
         # Modo interactivo desde el inicio
         controller = UR5Controller()
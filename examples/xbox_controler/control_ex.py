@@ -1,5 +1,22 @@
 import pygame
 import sys
+import numpy as np
+
+# Umbral de movimiento por eje: sticks izquierdo y derecho (X, Y), triggers
+AXIS_THRESHOLDS = np.array([0.5, 0.5, 0.5, 0.5, 0.1, 0.1], dtype=np.float32)
+# Texto de cada uno de los 9 estados posibles del D-pad (x, y)
+HAT_DIRECTIONS = {
+    (0, 0): "",
+    (0, 1): "Arriba",
+    (0, -1): "Abajo",
+    (1, 0): "Derecha",
+    (-1, 0): "Izquierda",
+    (1, 1): "Arriba + Derecha",
+    (-1, 1): "Arriba + Izquierda",
+    (1, -1): "Abajo + Derecha",
+    (-1, -1): "Abajo + Izquierda",
+}
+EVENT_WAIT_MS = 250  # Espera máxima por evento; solo acota la respuesta a Ctrl+C
 
 def main():
     # Inicializar pygame
@@ -15,10 +32,21 @@ def main():
     joystick = pygame.joystick.Joystick(0)
     joystick.init()
     
+    # Los conteos no cambian mientras el control siga conectado
+    num_buttons = joystick.get_numbuttons()
+    num_axes = joystick.get_numaxes()
+    num_hats = joystick.get_numhats()
+    get_axis = joystick.get_axis
+    
+    # Buffers de ejes reutilizados en cada lectura
+    read_axes = min(num_axes, len(AXIS_THRESHOLDS))
+    axes = np.zeros(len(AXIS_THRESHOLDS), dtype=np.float32)
+    magnitude = np.empty_like(axes)
+    
     print(f"Control conectado: {joystick.get_name()}")
-    print(f"Número de botones: {joystick.get_numbuttons()}")
-    print(f"Número de ejes: {joystick.get_numaxes()}")
-    print(f"Número de hats (D-pad): {joystick.get_numhats()}")
+    print(f"Número de botones: {num_buttons}")
+    print(f"Número de ejes: {num_axes}")
+    print(f"Número de hats (D-pad): {num_hats}")
     print("\nPresiona botones en el control (Ctrl+C para salir):")
     print("-" * 50)
     
@@ -37,72 +65,58 @@ def main():
         10: "Xbox Button"
     }
     
-    # Estado previo de botones para detectar cambios
-    button_states = [False] * joystick.get_numbuttons()
-    
     try:
-        clock = pygame.time.Clock()
-        
         while True:
-            # Procesar eventos
-            pygame.event.pump()
+            # Procesar eventos: SDL ya detecta los cambios y solo entrega los
+            # botones que se presionaron o liberaron. Se bloquea hasta el primer
+            # evento (sin despertar a ritmo fijo si no hay entrada) y luego se
+            # vacía lo que llegó junto con él
+            events = [pygame.event.wait(EVENT_WAIT_MS)]
+            events += pygame.event.get()
             
-            # Revisar estado de botones
-            for i in range(joystick.get_numbuttons()):
-                current_state = joystick.get_button(i)
-                
-                # Si el botón cambió de no presionado a presionado
-                if current_state and not button_states[i]:
-                    button_name = button_names.get(i, f"Botón {i}")
+            axis_moved = False
+            for event in events:
+                if event.type == pygame.JOYBUTTONDOWN:
+                    button_name = button_names.get(event.button, f"Botón {event.button}")
                     print(f"Botón presionado: {button_name}")
                 
-                # Si el botón cambió de presionado a no presionado
-                elif not current_state and button_states[i]:
-                    button_name = button_names.get(i, f"Botón {i}")
+                elif event.type == pygame.JOYBUTTONUP:
+                    button_name = button_names.get(event.button, f"Botón {event.button}")
                     print(f"Botón liberado: {button_name}")
                 
-                button_states[i] = current_state
-            
-            # Revisar los sticks analógicos (opcional)
-            left_x = joystick.get_axis(0)
-            left_y = joystick.get_axis(1)
-            right_x = joystick.get_axis(2) if joystick.get_numaxes() > 2 else 0
-            right_y = joystick.get_axis(3) if joystick.get_numaxes() > 3 else 0
-            
-            # Solo imprimir si hay movimiento significativo en los sticks
-            threshold = 0.5
-            if abs(left_x) > threshold or abs(left_y) > threshold:
-                print(f"Stick izquierdo: X={left_x:.2f}, Y={left_y:.2f}")
-            
-            if abs(right_x) > threshold or abs(right_y) > threshold:
-                print(f"Stick derecho: X={right_x:.2f}, Y={right_y:.2f}")
-            
-            # Revisar triggers (si están disponibles)
-            if joystick.get_numaxes() > 4:
-                left_trigger = joystick.get_axis(4)
-                right_trigger = joystick.get_axis(5) if joystick.get_numaxes() > 5 else 0
+                elif event.type == pygame.JOYAXISMOTION:
+                    axis_moved = True
                 
-                if left_trigger > 0.1:
-                    print(f"Trigger izquierdo: {left_trigger:.2f}")
-                if right_trigger > 0.1:
-                    print(f"Trigger derecho: {right_trigger:.2f}")
+                # Revisar D-pad
+                elif event.type == pygame.JOYHATMOTION and event.hat == 0:
+                    directions = HAT_DIRECTIONS[event.value]
+                    if directions:
+                        print(f"D-pad: {directions}")
             
-            # Revisar D-pad
-            if joystick.get_numhats() > 0:
-                hat = joystick.get_hat(0)
-                if hat != (0, 0):
-                    directions = []
-                    if hat[1] == 1:
-                        directions.append("Arriba")
-                    elif hat[1] == -1:
-                        directions.append("Abajo")
-                    if hat[0] == 1:
-                        directions.append("Derecha")
-                    elif hat[0] == -1:
-                        directions.append("Izquierda")
-                    print(f"D-pad: {' + '.join(directions)}")
-            
-            clock.tick(60)  # 60 FPS
+            # Los ejes solo se leen si alguno se movió en este cuadro
+            if axis_moved:
+                # Leer todos los ejes de una vez (los que falten quedan en 0)
+                axes[:read_axes] = np.fromiter((get_axis(i) for i in range(read_axes)),
+                                               dtype=np.float32, count=read_axes)
+                
+                # Sticks por magnitud; los triggers con signo, porque en
+                # reposo valen -1. Una sola comparación contra los umbrales
+                np.abs(axes[:4], out=magnitude[:4])
+                magnitude[4:] = axes[4:]
+                active = magnitude > AXIS_THRESHOLDS
+                
+                # Solo imprimir si hay movimiento significativo en los sticks
+                if active[0] or active[1]:
+                    print(f"Stick izquierdo: X={axes[0]:.2f}, Y={axes[1]:.2f}")
+                
+                if active[2] or active[3]:
+                    print(f"Stick derecho: X={axes[2]:.2f}, Y={axes[3]:.2f}")
+                
+                # Revisar triggers (si están disponibles)
+                if active[4]:
+                    print(f"Trigger izquierdo: {axes[4]:.2f}")
+                if active[5]:
+                    print(f"Trigger derecho: {axes[5]:.2f}")
             
     except KeyboardInterrupt:
         print("\nDesconectando...")